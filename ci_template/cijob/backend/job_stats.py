@@ -0,0 +1,141 @@
+"""Per-pipeline and per-workflow job analytics, maintained incrementally.
+
+Every group keeps running status counters and a quantile sketch of its job
+durations. Adding a job is O(1), so the aggregates are built once when the job
+history is loaded and then only updated with the rows appended after it;
+nothing ever rescans the history.
+"""
+
+import math
+import threading
+from dataclasses import dataclass, field
+from typing import Iterable
+
+# Lowercased statuses counted as a successful / failed run. Anything else
+# (e.g. "Pending") has not finished and does not count towards failure rates.
+SUCCESS_STATUSES = frozenset({"completed", "succeeded", "success"})
+FAILURE_STATUSES = frozenset({"canceled", "cancelled", "failed", "failure"})
+
+# Columns a job stats row is made of, in order.
+STATS_COLUMNS = ("pipeline", "workflow", "status", "duration_seconds")
+
+# Groupings the stats are kept for.
+GROUPS = ("pipeline", "workflow")
+
+
+class DurationSketch:
+    """Log-bucketed quantile sketch (as in DDSketch).
+
+    Values are counted in buckets whose bounds grow geometrically, so any
+    quantile is estimated within ``relative_accuracy`` of the true value using
+    a few hundred counters at most, however many values are added.
+    """
+
+    __slots__ = ("_buckets", "_gamma", "_gamma_log", "_zeros", "count")
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._gamma_log = math.log(self._gamma)
+        self._buckets: dict[int, int] = {}
+        self._zeros = 0
+        self.count = 0
+
+    def add(self, value: float):
+        self.count += 1
+        if value <= 0:
+            self._zeros += 1
+            return
+        index = math.ceil(math.log(value) / self._gamma_log)
+        self._buckets[index] = self._buckets.get(index, 0) + 1
+
+    def quantile(self, q: float) -> float | None:
+        """Estimate of the ``q`` quantile (0 to 1), or None if empty."""
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = self._zeros
+        if rank < seen:
+            return 0.0
+        for index in sorted(self._buckets):
+            seen += self._buckets[index]
+            if rank < seen:
+                # Bucket i holds (gamma^(i-1), gamma^i]; estimate with its midpoint.
+                return 2 * self._gamma**index / (self._gamma + 1)
+        return 2 * self._gamma ** max(self._buckets) / (self._gamma + 1)
+
+
+@dataclass(slots=True)
+class GroupStats:
+    """Running counters for one pipeline or workflow."""
+
+    jobs: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    durations: DurationSketch = field(default_factory=DurationSketch)
+
+    def add(self, status: str, duration_seconds: int | None):
+        self.jobs += 1
+        status = status.lower()
+        if status in SUCCESS_STATUSES:
+            self.succeeded += 1
+        elif status in FAILURE_STATUSES:
+            self.failed += 1
+        if duration_seconds is not None:
+            self.durations.add(duration_seconds)
+
+    @property
+    def failure_rate(self) -> float:
+        """Share of finished jobs that failed, from 0 to 1."""
+        finished = self.succeeded + self.failed
+        return self.failed / finished if finished else 0.0
+
+
+def format_duration(seconds: float | None) -> str:
+    """Render seconds like the CSV does, e.g. ``"1h 30m"``."""
+    if seconds is None:
+        return ""
+    minutes = round(seconds / 60)
+    if minutes < 60:
+        return f"{minutes}m"
+    return f"{minutes // 60}h {minutes % 60:02d}m"
+
+
+class JobStats:
+    """Aggregates of a job history, grouped by pipeline and by workflow."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.jobs = 0
+        self.groups: dict[str, dict[str, GroupStats]] = {group: {} for group in GROUPS}
+
+    def extend(self, rows: Iterable[tuple]):
+        """Add jobs, each a tuple of ``STATS_COLUMNS``."""
+        with self._lock:
+            for pipeline, workflow, status, duration_seconds in rows:
+                self.jobs += 1
+                for group, name in (("pipeline", pipeline), ("workflow", workflow)):
+                    stats = self.groups[group].get(name)
+                    if stats is None:
+                        stats = self.groups[group][name] = GroupStats()
+                    stats.add(status, duration_seconds)
+
+    def summary(
+        self, group: str, order: str = "p95", limit: int | None = None
+    ) -> list[dict]:
+        """One row per pipeline/workflow, worst first by ``order``.
+
+        ``order`` is ``"p95"`` (slowest first) or ``"failure_rate"``.
+        """
+        with self._lock:
+            rows = [
+                {
+                    group: name,
+                    "jobs": stats.jobs,
+                    "failure_rate": stats.failure_rate,
+                    "p50": stats.durations.quantile(0.5),
+                    "p95": stats.durations.quantile(0.95),
+                }
+                for name, stats in self.groups.get(group, {}).items()
+            ]
+        rows.sort(key=lambda row: row[order] or 0, reverse=True)
+        return rows[:limit]
@@ -0,0 +1,377 @@
+"""SQLite-backed store of the CI job history in data.csv.
+
+The CSV is ingested into an indexed SQLite database shared by every session
+and worker. Sessions only hold their search/sort/page settings and ask the
+store for one page (plus a total count) at a time.
+
+data.csv is followed like ``tail -f``: the database remembers how far into the
+file it has read, so a sync only parses and inserts the rows appended since.
+A truncated, rotated (replaced) or rewritten file is ingested again from the
+start, as a new generation with a new store key.
+"""
+
+import csv
+import os
+import re
+import sqlite3
+import threading
+from contextlib import closing
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import BinaryIO, Iterator
+
+from .job_stats import STATS_COLUMNS, JobStats
+
+data_csv = "data.csv"
+jobs_db = "jobs.db"
+
+# The job columns, in CSV order. Also the allowed sort columns.
+COLUMNS = ("pipeline", "status", "workflow", "timestamp", "duration")
+
+# Typed copies of the timestamp and duration columns, parsed once on ingest
+# (NULL when a value cannot be parsed).
+TYPED_COLUMNS = ("started_at", "duration_seconds")
+
+# Sort column -> ORDER BY key. Text columns sort case-insensitively, the
+# timestamp and duration chronologically / numerically.
+_SORT_KEYS = {
+    "pipeline": "pipeline COLLATE NOCASE",
+    "status": "status COLLATE NOCASE",
+    "workflow": "workflow COLLATE NOCASE",
+    "timestamp": "started_at",
+    "duration": "duration_seconds",
+}
+
+# Bumped whenever the schema changes, so an old jobs.db is rebuilt.
+_SCHEMA_VERSION = 3
+
+# Rows inserted per executemany call while ingesting.
+_BATCH_SIZE = 10_000
+
+# Leading bytes of the CSV remembered to tell an append from a rewrite.
+_HEAD_BYTES = 4096
+
+_SCHEMA = "\n".join(
+    [
+        "CREATE TABLE IF NOT EXISTS jobs (id INTEGER PRIMARY KEY, "
+        + ", ".join(f"{column} TEXT NOT NULL" for column in COLUMNS)
+        + ", started_at INTEGER, duration_seconds INTEGER);",
+        # One index per sort key; SQLite appends the rowid, so ties are
+        # already in CSV order.
+        *(
+            f"CREATE INDEX IF NOT EXISTS jobs_{column} ON jobs ({key});"
+            for column, key in _SORT_KEYS.items()
+        ),
+        # Trigram full-text index over the job table for substring search.
+        "CREATE VIRTUAL TABLE IF NOT EXISTS jobs_search USING fts5("
+        + ", ".join(COLUMNS)
+        + ", content='jobs', content_rowid='id', tokenize='trigram');",
+        # The ingested file: generation key, inode, bytes read and first bytes.
+        "CREATE TABLE IF NOT EXISTS source (key TEXT NOT NULL, "
+        "inode INTEGER NOT NULL, offset INTEGER NOT NULL, head BLOB NOT NULL);",
+        f"PRAGMA user_version = {_SCHEMA_VERSION};",
+    ]
+)
+
+_DROP_SCHEMA = "\n".join(
+    [
+        "DROP TABLE IF EXISTS jobs_search;",
+        "DROP TABLE IF EXISTS jobs;",
+        "DROP TABLE IF EXISTS source;",
+    ]
+)
+
+_DURATION_PART = re.compile(r"\s*(\d+)\s*([hms])", re.IGNORECASE)
+_DURATION_UNITS = {"h": 3600, "m": 60, "s": 1}
+
+
+def parse_duration(text: str) -> int | None:
+    """Seconds in a duration like ``"1h 30m"`` or ``"45s"``, or None."""
+    seconds, end = 0, 0
+    for match in _DURATION_PART.finditer(text):
+        if match.start() != end:
+            return None
+        seconds += int(match[1]) * _DURATION_UNITS[match[2].lower()]
+        end = match.end()
+    if end == 0 or text[end:].strip():
+        return None
+    return seconds
+
+
+def parse_timestamp(text: str) -> int | None:
+    """Unix time of an ISO timestamp like ``"2024-05-28 10:00"``, or None.
+
+    Timestamps without a timezone are taken to be UTC.
+    """
+    try:
+        parsed = datetime.fromisoformat(text.strip())
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp())
+
+
+def _complete_lines(file: BinaryIO) -> Iterator[str]:
+    """Lines from the current position up to the last complete one.
+
+    A trailing line without its newline is still being written: the file is
+    left positioned at its start, so the next sync reads it whole.
+    """
+    for line in file:
+        if not line.endswith(b"\n"):
+            file.seek(-len(line), os.SEEK_CUR)
+            return
+        yield line.decode("utf-8")
+
+
+def _batches(reader: csv.DictReader):
+    batch = []
+    for row in reader:
+        batch.append(
+            (
+                *(row[column] for column in COLUMNS),
+                parse_timestamp(row["timestamp"]),
+                parse_duration(row["duration"]),
+            )
+        )
+        if len(batch) == _BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+@dataclass(frozen=True)
+class JobFilter:
+    """Which jobs to show: a search string plus optional typed ranges.
+
+    ``started_from``/``started_before`` are Unix times (inclusive/exclusive),
+    ``min_duration``/``max_duration`` are seconds (both inclusive). Jobs whose
+    timestamp or duration could not be parsed never match a range on it.
+    """
+
+    search: str = ""
+    started_from: int | None = None
+    started_before: int | None = None
+    min_duration: int | None = None
+    max_duration: int | None = None
+
+
+@dataclass(frozen=True)
+class JobStore:
+    """Read-only query interface over an ingested job database."""
+
+    key: str
+    db_path: str
+    # Per-pipeline/workflow aggregates, kept in memory next to the database.
+    stats: JobStats = field(default_factory=JobStats, compare=False, repr=False)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path)
+
+    @staticmethod
+    def _search_clause(search: str) -> tuple[str, list]:
+        if len(search) >= 3:
+            # Trigram full-text index: substring match in any column.
+            phrase = '"' + search.replace('"', '""') + '"'
+            return (
+                "id IN (SELECT rowid FROM jobs_search WHERE jobs_search MATCH ?)",
+                [phrase],
+            )
+        # Too short for trigrams; fall back to a scan.
+        escaped = "".join("\\" + c if c in "\\%_" else c for c in search)
+        return (
+            "("
+            + " OR ".join(f"{column} LIKE ? ESCAPE '\\'" for column in COLUMNS)
+            + ")",
+            [f"%{escaped}%"] * len(COLUMNS),
+        )
+
+    @classmethod
+    def _where(cls, job_filter: JobFilter) -> tuple[str, list]:
+        clauses, params = [], []
+        if job_filter.search:
+            clause, search_params = cls._search_clause(job_filter.search)
+            clauses.append(clause)
+            params.extend(search_params)
+        for clause, value in (
+            ("started_at >= ?", job_filter.started_from),
+            ("started_at < ?", job_filter.started_before),
+            ("duration_seconds >= ?", job_filter.min_duration),
+            ("duration_seconds <= ?", job_filter.max_duration),
+        ):
+            if value is not None:
+                clauses.append(clause)
+                params.append(value)
+        if not clauses:
+            return "", []
+        return "WHERE " + " AND ".join(clauses), params
+
+    def count(self, job_filter: JobFilter) -> int:
+        """Number of jobs matching ``job_filter``."""
+        where, params = self._where(job_filter)
+        with closing(self._connect()) as conn:
+            return conn.execute(
+                f"SELECT count(*) FROM jobs {where}", params
+            ).fetchone()[0]
+
+    def duration_bounds(self) -> tuple[int, int]:
+        """Shortest and longest parsed job duration, in seconds."""
+        with closing(self._connect()) as conn:
+            low, high = conn.execute(
+                "SELECT min(duration_seconds), max(duration_seconds) FROM jobs"
+            ).fetchone()
+        return (low or 0, high or 0)
+
+    def page(
+        self,
+        job_filter: JobFilter,
+        sort: str = "",
+        reverse: bool = False,
+        offset: int = 0,
+        limit: int = 12,
+    ) -> list[dict]:
+        """One page of jobs matching ``job_filter``, ordered by ``sort``.
+
+        Text columns sort case-insensitively, timestamps and durations by their
+        parsed value; ties keep CSV order, in both directions.
+        """
+        where, params = self._where(job_filter)
+        order = "id"
+        if sort in _SORT_KEYS:
+            order = f"{_SORT_KEYS[sort]} {'DESC' if reverse else 'ASC'}, id"
+        query = (
+            f"SELECT {', '.join(COLUMNS)} FROM jobs {where} "
+            f"ORDER BY {order} LIMIT ? OFFSET ?"
+        )
+        with closing(self._connect()) as conn:
+            rows = conn.execute(query, [*params, limit, offset]).fetchall()
+        return [dict(zip(COLUMNS, row, strict=True)) for row in rows]
+
+    @property
+    def rows(self) -> int:
+        """Number of jobs this process has caught up with."""
+        return self.stats.jobs
+
+    def catch_up(self):
+        """Add the jobs appended since the last call to ``stats``."""
+        with closing(self._connect()) as conn:
+            self.stats.extend(
+                conn.execute(
+                    f"SELECT {', '.join(STATS_COLUMNS)} FROM jobs "
+                    "WHERE id > ? ORDER BY id",
+                    (self.stats.jobs,),
+                )
+            )
+
+
+def _sync(csv_path: Path, db_path: str) -> str:
+    """Ingest whatever the database has not seen of the CSV yet.
+
+    Returns the key of the ingested generation of the file.
+    """
+    with (
+        closing(sqlite3.connect(db_path, timeout=60)) as conn,
+        csv_path.open("rb") as file,
+    ):
+        if conn.execute("PRAGMA user_version").fetchone()[0] != _SCHEMA_VERSION:
+            conn.executescript(_DROP_SCHEMA)
+        conn.executescript(_SCHEMA)
+        # Take the write lock before checking, so concurrent workers ingest once.
+        conn.execute("BEGIN IMMEDIATE")
+        source = conn.execute("SELECT key, inode, offset, head FROM source").fetchone()
+        stat = os.fstat(file.fileno())
+        head = file.read(_HEAD_BYTES)
+        file.seek(0)
+        header = file.readline()
+        if not header.endswith(b"\n"):
+            # Not even a complete header yet.
+            header = b""
+        fieldnames = next(csv.reader([header.decode("utf-8")]), [])
+
+        if (
+            source is None
+            or source[1] != stat.st_ino
+            or stat.st_size < source[2]
+            or not head.startswith(source[3])
+        ):
+            # New, rotated, truncated or rewritten file: start a new generation.
+            key = f"{csv_path}:{stat.st_ino}:{stat.st_mtime_ns}"
+            offset = 0
+            conn.execute("DELETE FROM jobs")
+        else:
+            key, offset = source[0], source[2]
+            if offset == stat.st_size:
+                conn.rollback()
+                return key
+
+        last_id = conn.execute("SELECT coalesce(max(id), 0) FROM jobs").fetchone()[0]
+        file.seek(max(offset, len(header)))
+        if fieldnames:
+            reader = csv.DictReader(_complete_lines(file), fieldnames=fieldnames)
+            for batch in _batches(reader):
+                conn.executemany(
+                    f"INSERT INTO jobs ({', '.join(COLUMNS + TYPED_COLUMNS)}) "
+                    f"VALUES ({', '.join('?' * len(COLUMNS + TYPED_COLUMNS))})",
+                    batch,
+                )
+        if last_id == 0:
+            conn.execute("INSERT INTO jobs_search(jobs_search) VALUES ('rebuild')")
+        else:
+            # Only index the appended rows.
+            conn.execute(
+                f"INSERT INTO jobs_search (rowid, {', '.join(COLUMNS)}) "
+                f"SELECT id, {', '.join(COLUMNS)} FROM jobs WHERE id > ?",
+                (last_id,),
+            )
+        conn.execute("DELETE FROM source")
+        conn.execute(
+            "INSERT INTO source (key, inode, offset, head) VALUES (?, ?, ?, ?)",
+            (key, stat.st_ino, file.tell(), head),
+        )
+        conn.commit()
+        return key
+
+
+_lock = threading.Lock()
+_current: JobStore | None = None
+# (path, inode, size, mtime) of the CSV when this process last synced it.
+_synced: tuple | None = None
+
+
+def load_job_store(csv_path: str = data_csv, db_path: str = jobs_db) -> JobStore:
+    """Return the shared job store, ingesting only what changed in the CSV.
+
+    Cheap to call repeatedly: while the file is untouched this is one stat.
+    """
+    global _current, _synced
+    stat = Path(csv_path).stat()
+    signature = (csv_path, stat.st_ino, stat.st_size, stat.st_mtime_ns)
+    with _lock:
+        if _current is None or _synced != signature:
+            key = _sync(Path(csv_path), db_path)
+            if _current is None or _current.key != key:
+                _current = JobStore(key=key, db_path=db_path)
+            # Pick up the rows this (or another) worker just appended.
+            _current.catch_up()
+            _synced = signature
+        return _current
+
+
+def get_job_store(key: str, rows: int = 0) -> JobStore | None:
+    """The job store behind a session's ``_store_key``, or None before it loads.
+
+    ``rows`` is the number of jobs the session has seen; the store is synced
+    first if this process is behind it.
+    """
+    if not key:
+        return None
+    store = _current
+    if store is None or store.key != key or store.rows < rows:
+        # Another worker ingested newer rows or a rewritten CSV. Sessions page
+        # with SQL rather than cached row numbers, so the latest generation can
+        # serve them as is; follow_jobs moves their handle onto it.
+        store = load_job_store(key.rsplit(":", 2)[0])
+    return store
@@ -1,9 +1,25 @@
-import csv
+import asyncio
 from dataclasses import dataclass
-from pathlib import Path
-from typing import List
 
 import reflex as rx
+from reflex.utils.prerequisites import get_and_validate_app
+
+from .job_stats import format_duration
+from .job_store import (
+    JobFilter,
+    JobStore,
+    get_job_store,
+    load_job_store,
+    parse_timestamp,
+)
+
+_DAY = 24 * 60 * 60
+
+# Seconds between checks of data.csv for appended jobs.
+_FOLLOW_INTERVAL = 2
+# Seconds a tab may stay disconnected (e.g. while its websocket reconnects)
+# before it stops following.
+_FOLLOW_DISCONNECTED = 30
 
 
 @dataclass
@@ -17,58 +33,115 @@ class Item:
     duration: str
 
 
+@dataclass
+class GroupStatsItem:
+    """One pipeline's or workflow's row in the job analytics."""
+
+    name: str
+    jobs: int
+    failure_rate: str
+    p50: str
+    p95: str
+
+
+def _connected(token: str) -> bool:
+    """Whether the tab with this client token has a websocket to this worker."""
+    namespace = get_and_validate_app().app.event_namespace
+    return namespace is not None and token in namespace.token_to_sid
+
+
 class TableState(rx.State):
     """The state class."""
 
-    items: List[Item] = []
+    # Handle of the shared job store this session was loaded with.
+    _store_key: str = ""
+    # Number of jobs in the store when this session last looked.
+    _store_rows: int = 0
+    _following: bool = False
 
     search_value: str = ""
     sort_value: str = ""
     sort_reverse: bool = False
 
-    total_items: int = 0
+    # Time window, as "YYYY-MM-DD" dates (both inclusive, empty for no bound).
+    started_from: str = ""
+    started_until: str = ""
+
+    # Duration range in minutes, and the range of durations in the job history.
+    duration: tuple[int, int] = (0, 0)
+    duration_limits: tuple[int, int] = (0, 0)
+
     offset: int = 0
     limit: int = 12  # Number of rows per page
 
+    # Job analytics: group by "pipeline" or "workflow", rank by "p95" or
+    # "failure_rate".
+    stats_group: str = "workflow"
+    stats_order: str = "p95"
+    stats_limit: int = 10
+
     @rx.event
     def set_search_value(self, value: str):
         self.search_value = value
+        self.offset = 0
 
     @rx.event
     def set_sort_value(self, value: str):
         self.sort_value = value
 
+    @rx.event
+    def set_stats_group(self, value: str):
+        self.stats_group = value
+
+    @rx.event
+    def set_stats_order(self, value: str):
+        self.stats_order = value
+
+    @rx.event
+    def set_started_from(self, value: str):
+        self.started_from = value
+        self.offset = 0
+
+    @rx.event
+    def set_started_until(self, value: str):
+        self.started_until = value
+        self.offset = 0
+
+    @rx.event
+    def set_duration(self, value: list[int | float]):
+        self.duration = (int(value[0]), int(value[1]))
+        self.offset = 0
+
+    @rx.event
+    def clear_filters(self):
+        self.started_from = ""
+        self.started_until = ""
+        self.duration = self.duration_limits
+        self.offset = 0
+
     @rx.var(cache=True)
-    def filtered_sorted_items(self) -> List[Item]:
-        items = self.items
-
-        # Filter items based on selected item
-        if self.sort_value:
-            items = sorted(
-                items,
-                key=lambda item: str(getattr(item, self.sort_value)).lower(),
-                reverse=self.sort_reverse,
-            )
+    def _job_filter(self) -> JobFilter:
+        started_from = parse_timestamp(self.started_from) if self.started_from else None
+        started_until = (
+            parse_timestamp(self.started_until) if self.started_until else None
+        )
+        # Only narrow on duration once the range is tighter than the data's, so
+        # jobs whose duration cannot be parsed are still listed by default.
+        low, high = self.duration
+        return JobFilter(
+            search=self.search_value,
+            started_from=started_from,
+            started_before=None if started_until is None else started_until + _DAY,
+            min_duration=low * 60 if low > self.duration_limits[0] else None,
+            max_duration=high * 60 if high < self.duration_limits[1] else None,
+        )
 
-        # Filter items based on search value
-        if self.search_value:
-            search_value = self.search_value.lower()
-            items = [
-                item
-                for item in items
-                if any(
-                    search_value in str(getattr(item, attr)).lower()
-                    for attr in [
-                        "pipeline",
-                        "status",
-                        "workflow",
-                        "timestamp",
-                        "duration",
-                    ]
-                )
-            ]
-
-        return items
+    @rx.var(cache=True)
+    def total_items(self) -> int:
+        store = get_job_store(self._store_key, self._store_rows)
+        if store is None:
+            return 0
+        return store.count(self._job_filter)
 
     @rx.var(cache=True)
     def page_number(self) -> int:
@@ -82,9 +155,34 @@ class TableState(rx.State):
 
     @rx.var(cache=True, initial_value=[])
     def get_current_page(self) -> list[Item]:
-        start_index = self.offset
-        end_index = start_index + self.limit
-        return self.filtered_sorted_items[start_index:end_index]
+        store = get_job_store(self._store_key, self._store_rows)
+        if store is None:
+            return []
+        rows = store.page(
+            self._job_filter,
+            sort=self.sort_value,
+            reverse=self.sort_reverse,
+            offset=self.offset,
+            limit=self.limit,
+        )
+        return [Item(**row) for row in rows]
+
+    @rx.var(cache=True, initial_value=[])
+    def get_group_stats(self) -> list[GroupStatsItem]:
+        store = get_job_store(self._store_key, self._store_rows)
+        if store is None:
+            return []
+        rows = store.stats.summary(self.stats_group, self.stats_order, self.stats_limit)
+        return [
+            GroupStatsItem(
+                name=row[self.stats_group],
+                jobs=row["jobs"],
+                failure_rate=f"{row['failure_rate']:.0%}",
+                p50=format_duration(row["p50"]),
+                p95=format_duration(row["p95"]),
+            )
+            for row in rows
+        ]
 
     def prev_page(self):
         if self.page_number > 1:
@@ -98,14 +196,55 @@ class TableState(rx.State):
         self.offset = 0
 
     def last_page(self):
-        self.offset = (self.total_pages - 1) * self.limit
+        self.offset = max(self.total_pages - 1, 0) * self.limit
+
+    def _set_store(self, store: JobStore):
+        self._store_key = store.key
+        self._store_rows = store.rows
+        low, high = store.duration_bounds()
+        # Whole minutes, rounded outwards so the range covers every job.
+        limits = (low // 60, -(-high // 60))
+        if self.duration == self.duration_limits:
+            # Not narrowed by the user: follow the data.
+            self.duration = limits
+        self.duration_limits = limits
 
     def load_entries(self):
-        with Path("data.csv").open(encoding="utf-8") as file:
-            reader = csv.DictReader(file)
-            self.items = [Item(**row) for row in reader]
-            self.total_items = len(self.items)
+        self._set_store(load_job_store())
+
+    @rx.event(background=True)
+    async def follow_jobs(self):
+        """Pick up jobs appended to data.csv while the dashboard is open.
+
+        Only the appended rows are ingested (once per process, not per
+        session); sessions just move their handle forward, which refreshes
+        the current page, the count and the analytics. Reflex does not cancel
+        background tasks, so this stops by itself once the tab has been gone
+        for ``_FOLLOW_DISCONNECTED`` seconds; loading the page starts it again.
+        """
+        async with self:
+            if self._following:
+                return
+            self._following = True
+        token = self.router.session.client_token
+        disconnected = 0.0
+        try:
+            while disconnected < _FOLLOW_DISCONNECTED:
+                await asyncio.sleep(_FOLLOW_INTERVAL)
+                if not _connected(token):
+                    disconnected += _FOLLOW_INTERVAL
+                    continue
+                disconnected = 0.0
+                store = await asyncio.to_thread(load_job_store)
+                async with self:
+                    if (store.key, store.rows) != (
+                        self._store_key,
+                        self._store_rows,
+                    ):
+                        self._set_store(store)
+        finally:
+            async with self:
+                self._following = False
 
     def toggle_sort(self):
         self.sort_reverse = not self.sort_reverse
-        self.load_entries()
@@ -4,10 +4,15 @@ import reflex as rx
 
 from ..backend.table_state import TableState
 from ..templates import template
+from ..views.job_stats import job_stats_table
 from ..views.table import main_table
 
 
-@template(route="/", title="Dashboard", on_load=TableState.load_entries)
+@template(
+    route="/",
+    title="Dashboard",
+    on_load=[TableState.load_entries, TableState.follow_jobs],
+)
 def dashboard() -> rx.Component:
     """The dashboard page.
 
@@ -18,6 +23,7 @@ def dashboard() -> rx.Component:
     return rx.vstack(
         rx.heading("CI Job Dashboard", size="5"),
         main_table(),
+        job_stats_table(),
         spacing="8",
         width="100%",
     )
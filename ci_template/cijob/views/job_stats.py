@@ -0,0 +1,84 @@
+import reflex as rx
+
+from ..backend.table_state import GroupStatsItem, TableState
+
+
+def _header_cell(text: str | rx.Var, icon: str) -> rx.Component:
+    return rx.table.column_header_cell(
+        rx.hstack(
+            rx.icon(icon, size=18),
+            rx.text(text),
+            align="center",
+            spacing="2",
+        ),
+    )
+
+
+def _show_group(item: GroupStatsItem) -> rx.Component:
+    return rx.table.row(
+        rx.table.row_header_cell(item.name),
+        rx.table.cell(item.jobs),
+        rx.table.cell(item.failure_rate),
+        rx.table.cell(item.p50),
+        rx.table.cell(item.p95),
+        align="center",
+    )
+
+
+def job_stats_table() -> rx.Component:
+    return rx.box(
+        rx.flex(
+            rx.heading("Slowest & Flakiest", size="4"),
+            rx.flex(
+                rx.select.root(
+                    rx.select.trigger(),
+                    rx.select.content(
+                        rx.select.item("By Workflow", value="workflow"),
+                        rx.select.item("By Pipeline", value="pipeline"),
+                    ),
+                    value=TableState.stats_group,
+                    size="2",
+                    on_change=TableState.set_stats_group,
+                ),
+                rx.select.root(
+                    rx.select.trigger(),
+                    rx.select.content(
+                        rx.select.item("Rank: p95 Duration", value="p95"),
+                        rx.select.item("Rank: Failure Rate", value="failure_rate"),
+                    ),
+                    value=TableState.stats_order,
+                    size="2",
+                    on_change=TableState.set_stats_order,
+                ),
+                align="center",
+                spacing="3",
+            ),
+            spacing="3",
+            justify="between",
+            align="center",
+            wrap="wrap",
+            width="100%",
+            padding_bottom="1em",
+        ),
+        rx.table.root(
+            rx.table.header(
+                rx.table.row(
+                    _header_cell(
+                        rx.cond(
+                            TableState.stats_group == "pipeline", "Pipeline", "Workflow"
+                        ),
+                        "route",
+                    ),
+                    _header_cell("Jobs", "hash"),
+                    _header_cell("Failure Rate", "ban"),
+                    _header_cell("p50", "clock"),
+                    _header_cell("p95", "clock-alert"),
+                ),
+            ),
+            rx.table.body(rx.foreach(TableState.get_group_stats, _show_group)),
+            variant="surface",
+            size="2",
+            width="100%",
+        ),
+        width="100%",
+    )
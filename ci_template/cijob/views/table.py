@@ -90,6 +90,64 @@ def _show_item(item: Item, index: int) -> rx.Component:
     )
 
 
+def _filters_view() -> rx.Component:
+    return rx.flex(
+        rx.hstack(
+            rx.icon("calendar", size=18),
+            rx.input(
+                type="date",
+                value=TableState.started_from,
+                size="2",
+                on_change=TableState.set_started_from,
+            ),
+            rx.text("to"),
+            rx.input(
+                type="date",
+                value=TableState.started_until,
+                size="2",
+                on_change=TableState.set_started_until,
+            ),
+            align="center",
+            spacing="2",
+        ),
+        rx.hstack(
+            rx.icon("clock", size=18, flex_shrink="0"),
+            rx.vstack(
+                rx.slider(
+                    value=TableState.duration,
+                    min=TableState.duration_limits[0],
+                    max=TableState.duration_limits[1],
+                    variant="soft",
+                    on_change=TableState.set_duration,
+                ),
+                rx.hstack(
+                    rx.badge("Min: ", TableState.duration[0], "m"),
+                    rx.spacer(),
+                    rx.badge("Max: ", TableState.duration[1], "m"),
+                    width="100%",
+                ),
+                width="100%",
+            ),
+            align="center",
+            spacing="2",
+            min_width="250px",
+        ),
+        rx.button(
+            rx.icon("filter-x", size=18),
+            "Clear",
+            size="2",
+            variant="soft",
+            color_scheme="gray",
+            on_click=TableState.clear_filters,
+        ),
+        spacing="5",
+        align="center",
+        wrap="wrap",
+        width="100%",
+        padding_bottom="1em",
+    )
+
+
 def _pagination_view() -> rx.Component:
     return (
         rx.hstack(
@@ -224,6 +282,7 @@ def main_table() -> rx.Component:
             width="100%",
             padding_bottom="1em",
         ),
+        _filters_view(),
         rx.table.root(
             rx.table.header(
                 rx.table.row(
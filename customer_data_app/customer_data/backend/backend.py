@@ -1,9 +1,22 @@
+import asyncio
+import csv
 from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Union
+from typing import Any, Union
+from urllib.parse import urlencode
 
 import reflex as rx
-from sqlmodel import String, asc, cast, desc, func, or_, select
+from reflex.config import get_config
+from sqlalchemy import and_, tuple_
+from sqlalchemy.orm import aliased
+from sqlmodel import case, func, select
+
+from .bulk import EXPORT_PATH, import_customers
+from .models import SORT_FIELDS, Customer, sort_key
+from .search import apply_search, search_rank, search_terms
+
+# Seconds the search waits for typing to pause before querying.
+_SEARCH_DEBOUNCE = 0.3
 
 
 def _get_percentage_change(
@@ -19,16 +32,24 @@ def _get_percentage_change(
     return percentage_change
 
 
-class Customer(rx.Model, table=True):
-    """The customer model."""
+def _month_starts(now: datetime) -> tuple[datetime, datetime]:
+    """The start of the month of ``now`` and of the month before."""
+    start_of_month = datetime(now.year, now.month, 1)
+    return start_of_month, (start_of_month - timedelta(days=1)).replace(day=1)
+
+
+def _read_page(query, forward: bool) -> tuple[list[Customer], list[list[Any]]]:
+    """Run a page query: the customers, in table order, and their keys."""
+    with rx.session() as session:
+        rows = session.exec(query).all()
+    if not forward:
+        rows.reverse()
+    return [row[0] for row in rows], [list(row[1:]) for row in rows]
 
-    name: str
-    email: str
-    phone: str
-    address: str
-    date: str
-    payments: float
-    status: str
+
+def _read_count(query) -> int:
+    with rx.session() as session:
+        return session.exec(query).one()
 
 
 @dataclass
@@ -43,112 +64,348 @@ class MonthValues:
 class State(rx.State):
     """The app state."""
 
+    # The current page of users, and the (sort key, id) of each, to seek from.
     users: list[Customer] = []
+    _page_keys: list[list[Any]] = []
+    total_items: int = 0
+    page_number: int = 1
+    page_size: int = 12
     sort_value: str = ""
     sort_reverse: bool = False
     search_value: str = ""
+    # Bumped on every search change; only the newest search runs.
+    _search_generation: int = 0
     current_user: Customer = Customer()
     # Values for current and previous month
     current_month_values: MonthValues = MonthValues()
     previous_month_values: MonthValues = MonthValues()
+    # Start of the month the month values were computed in.
+    _month_start: datetime | None = None
+
+    def _sort_keys(self, entity=Customer) -> list:
+        """The (sort key, id) rows of ``entity`` are ordered by."""
+        if self.sort_value in SORT_FIELDS:
+            return [sort_key(self.sort_value, entity), entity.id]
+        return [entity.id]
+
+    def _ranked(self) -> bool:
+        """Whether rows are ordered by search relevance."""
+        return (
+            self.sort_value not in SORT_FIELDS
+            and search_rank(self.search_value) is not None
+        )
+
+    def _page_query(
+        self,
+        cursor: list[Any] | None = None,
+        forward: bool = True,
+        limit: int = 0,
+        offset: int = 0,
+    ):
+        """The query for the rows after (or before) the ``cursor`` row.
+
+        Pages are read by keyset: rows are ordered by (sort key, id) and a page
+        starts right after the last row of the previous one, so any page costs
+        one index seek rather than skipping over all earlier rows.
+        """
+        keys = self._sort_keys()
+        descending = not forward
+        if self.sort_value in SORT_FIELDS:
+            descending = self.sort_reverse != descending
+        elif self._ranked():
+            # Unsorted search results come best match first.
+            keys.insert(0, search_rank(self.search_value))
+
+        query = apply_search(select(Customer, *keys), Customer.id, self.search_value)
+        if cursor is not None:
+            position, cursor = tuple_(*keys), tuple_(*cursor)
+            if descending:
+                query = query.where(position < cursor)
+            else:
+                query = query.where(position > cursor)
+        query = query.order_by(*(key.desc() if descending else key for key in keys))
+        return query.offset(offset).limit(limit or self.page_size)
+
+    def _fetch(
+        self,
+        cursor: list[Any] | None = None,
+        forward: bool = True,
+        limit: int = 0,
+        offset: int = 0,
+    ) -> tuple[list[Customer], list[list[Any]]]:
+        """The rows after (or before) the ``cursor`` row, and their keys."""
+        return _read_page(self._page_query(cursor, forward, limit, offset), forward)
+
+    def _load_page(
+        self,
+        cursor: list[Any] | None = None,
+        forward: bool = True,
+        limit: int = 0,
+        offset: int = 0,
+    ):
+        """Load the page after (or before) the ``cursor`` row."""
+        self.users, self._page_keys = self._fetch(cursor, forward, limit, offset)
 
-    def load_entries(self) -> list[Customer]:
-        """Get all users from the database."""
+    def _reload_page(self):
+        """Re-read the current page by its position in the table.
+
+        Used when a write shifts which rows make up page N (a row added or
+        removed before it, or every row's relevance changing), so the page's
+        old first row is no longer where it starts.
+        """
+        if self.page_number > self.total_pages:
+            self.last_page()
+        else:
+            self._load_page(offset=(self.page_number - 1) * self.page_size)
+
+    def _fill_page(self):
+        """Top the page up with the rows following it, e.g. after a delete."""
+        missing = self.page_size - len(self.users)
+        if missing > 0 and self._page_keys:
+            users, keys = self._fetch(self._page_keys[-1], limit=missing)
+            self.users.extend(users)
+            self._page_keys.extend(keys)
+        if not self.users:
+            self._reload_page()
+
+    def _matches(self, customer_id: int) -> bool:
+        """Whether a customer matches the current search."""
+        if not search_terms(self.search_value):
+            return True
+        query = apply_search(
+            select(Customer.id).where(Customer.id == customer_id),
+            Customer.id,
+            self.search_value,
+        )
         with rx.session() as session:
-            query = select(Customer)
-            if self.search_value:
-                search_value = f"%{str(self.search_value).lower()}%"
-                query = query.where(
-                    or_(
-                        *[
-                            getattr(Customer, field).ilike(search_value)
-                            for field in Customer.get_fields()
-                            if field not in ["id", "payments"]
-                        ],
-                        # ensures that payments is cast to a string before applying the ilike operator
-                        cast(Customer.payments, String).ilike(search_value),
-                    )
-                )
-
-            if self.sort_value:
-                sort_column = getattr(Customer, self.sort_value)
-                if self.sort_value == "payments":
-                    order = desc(sort_column) if self.sort_reverse else asc(sort_column)
-                else:
-                    order = (
-                        desc(func.lower(sort_column))
-                        if self.sort_reverse
-                        else asc(func.lower(sort_column))
-                    )
-                query = query.order_by(order)
-
-            self.users = session.exec(query).all()
-
-        self.get_current_month_values()
-        self.get_previous_month_values()
-
-    def get_current_month_values(self):
-        """Calculate current month's values."""
-        now = datetime.now()
-        start_of_month = datetime(now.year, now.month, 1)
-
-        current_month_users = [
-            user
-            for user in self.users
-            if datetime.strptime(user.date, "%Y-%m-%d %H:%M:%S") >= start_of_month
-        ]
-        num_customers = len(current_month_users)
-        total_payments = sum(user.payments for user in current_month_users)
-        num_delivers = len(
-            [user for user in current_month_users if user.status == "Delivered"]
+            return session.exec(query).first() is not None
+
+    def _before_page(self, customer_id: int) -> bool:
+        """Whether a matching customer sorts before the current page (past page one)."""
+        if self.page_number == 1 or not self._page_keys or self._ranked():
+            return False
+        keys = self._sort_keys()
+        position, first = tuple_(*keys), tuple_(*self._page_keys[0])
+        if self.sort_value in SORT_FIELDS and self.sort_reverse:
+            before = position > first
+        else:
+            before = position < first
+        query = apply_search(
+            select(Customer.id).where(Customer.id == customer_id, before),
+            Customer.id,
+            self.search_value,
         )
-        self.current_month_values = MonthValues(
-            num_customers=num_customers,
-            total_payments=total_payments,
-            num_delivers=num_delivers,
+        with rx.session() as session:
+            return session.exec(query).first() is not None
+
+    def _remove_from_page(self, customer_id: int) -> bool:
+        """Drop a customer from the current page; whether it was on it."""
+        for index, user in enumerate(self.users):
+            if user.id == customer_id:
+                del self.users[index]
+                del self._page_keys[index]
+                return True
+        return False
+
+    def _place(self, customer: Customer):
+        """Put a new or changed customer where it belongs on the current page.
+
+        The database counts the page rows sorting before it (so the comparison
+        uses its collation), in the same query that checks the customer matches
+        the search. A customer sorting after the last row of a full page
+        belongs to a later page; one sorting before the first row (past page
+        one) pushes every row down by one, so the page is read again.
+        """
+        keys = self._sort_keys()
+        page = aliased(Customer)
+        position, page_position = tuple_(*keys), tuple_(*self._sort_keys(page))
+        if self.sort_value in SORT_FIELDS and self.sort_reverse:
+            before = page_position > position
+        else:
+            before = page_position < position
+        page_ids = [user.id for user in self.users]
+        query = (
+            select(func.count(page.id), *keys)
+            .select_from(Customer)
+            .outerjoin(page, and_(page.id.in_(page_ids), before))
+            .where(Customer.id == customer.id)
+            .group_by(*keys)
         )
+        query = apply_search(query, Customer.id, self.search_value)
+        with rx.session() as session:
+            row = session.exec(query).first()
+        if row is None:
+            return
+        index = row[0]
+        if index == 0 and self.page_number > 1:
+            self._reload_page()
+            return
+        if index >= self.page_size:
+            return
+        self.users.insert(index, customer)
+        self._page_keys.insert(index, list(row[1:]))
+        if len(self.users) > self.page_size:
+            self.users.pop()
+            self._page_keys.pop()
+
+    def _patch_month_values(
+        self, removed: Customer | None = None, added: Customer | None = None
+    ):
+        """Take a customer out of and/or add one to the month values."""
+        start_of_month, start_of_last_month = _month_starts(datetime.now())
+        if self._month_start != start_of_month:
+            # Not loaded yet, or a new month has begun since.
+            self.load_month_values()
+            return
+        for customer, sign in ((removed, -1), (added, 1)):
+            if customer is None or customer.date < start_of_last_month:
+                continue
+            field = (
+                "current_month_values"
+                if customer.date >= start_of_month
+                else "previous_month_values"
+            )
+            values = getattr(self, field)
+            setattr(
+                self,
+                field,
+                MonthValues(
+                    num_customers=values.num_customers + sign,
+                    total_payments=values.total_payments + sign * customer.payments,
+                    num_delivers=values.num_delivers
+                    + sign * (customer.status == "Delivered"),
+                ),
+            )
 
-    def get_previous_month_values(self):
-        """Calculate previous month's values."""
-        now = datetime.now()
-        first_day_of_current_month = datetime(now.year, now.month, 1)
-        last_day_of_last_month = first_day_of_current_month - timedelta(days=1)
-        start_of_last_month = datetime(
-            last_day_of_last_month.year, last_day_of_last_month.month, 1
+    def _count_query(self):
+        return apply_search(
+            select(func.count()).select_from(Customer), Customer.id, self.search_value
         )
 
-        previous_month_users = [
-            user
-            for user in self.users
-            if start_of_last_month
-            <= datetime.strptime(user.date, "%Y-%m-%d %H:%M:%S")
-            <= last_day_of_last_month
-        ]
-        # We add some dummy values to simulate growth/decline. Remove them in production.
-        num_customers = len(previous_month_users) + 3
-        total_payments = sum(user.payments for user in previous_month_users) + 240
-        num_delivers = (
-            len([user for user in previous_month_users if user.status == "Delivered"])
-            + 5
+    def _count_matches(self) -> int:
+        return _read_count(self._count_query())
+
+    def _count_users(self):
+        self.total_items = self._count_matches()
+
+    def load_entries(self):
+        """Count the matching users, load the first page and the month values."""
+        self._count_users()
+        self.first_page()
+        self.load_month_values()
+
+    @rx.var(cache=True)
+    def total_pages(self) -> int:
+        return max(-(-self.total_items // self.page_size), 1)
+
+    def first_page(self):
+        self.page_number = 1
+        self._load_page()
+
+    def next_page(self):
+        if self.page_number < self.total_pages:
+            self.page_number += 1
+            self._load_page(self._page_keys[-1] if self._page_keys else None)
+
+    def prev_page(self):
+        if self.page_number > 1:
+            self.page_number -= 1
+            self._load_page(self._page_keys[0] if self._page_keys else None, False)
+
+    def last_page(self):
+        self.page_number = self.total_pages
+        last_page_size = self.total_items % self.page_size or self.page_size
+        self._load_page(forward=False, limit=last_page_size)
+
+    def load_month_values(self):
+        """Aggregate this and last month's values in a single query."""
+        start_of_month, start_of_last_month = _month_starts(datetime.now())
+
+        is_current = case((Customer.date >= start_of_month, 1), else_=0)
+        query = (
+            select(
+                is_current,
+                func.count(),
+                func.coalesce(func.sum(Customer.payments), 0.0),
+                func.count(case((Customer.status == "Delivered", 1))),
+            )
+            .where(Customer.date >= start_of_last_month)
+            .group_by(is_current)
         )
+        with rx.session() as session:
+            rows = session.exec(query).all()
+        months = {
+            current: MonthValues(
+                num_customers=num_customers,
+                total_payments=total_payments,
+                num_delivers=num_delivers,
+            )
+            for current, num_customers, total_payments, num_delivers in rows
+        }
+        self.current_month_values = months.get(1, MonthValues())
+        self._month_start = start_of_month
 
+        previous = months.get(0, MonthValues())
+        # We add some dummy values to simulate growth/decline. Remove them in production.
         self.previous_month_values = MonthValues(
-            num_customers=num_customers,
-            total_payments=total_payments,
-            num_delivers=num_delivers,
+            num_customers=previous.num_customers + 3,
+            total_payments=previous.total_payments + 240,
+            num_delivers=previous.num_delivers + 5,
         )
 
     def sort_values(self, sort_value: str):
         self.sort_value = sort_value
-        self.load_entries()
+        self.first_page()
 
     def toggle_sort(self):
         self.sort_reverse = not self.sort_reverse
-        self.load_entries()
+        self.first_page()
 
     def filter_values(self, search_value):
         self.search_value = search_value
-        self.load_entries()
+        self._search_generation += 1
+        return State.run_search(self._search_generation)
+
+    @rx.event(background=True)
+    async def run_search(self, generation: int):
+        """Count and load the first page of matches once typing pauses.
+
+        Every keystroke schedules a search, but each one first waits a moment
+        and is dropped if a newer one has been scheduled meanwhile, so a burst
+        of typing costs a single query. The queries are built under the state
+        lock but run in a worker thread without it, so other events of the
+        session are not held up. The count is applied as long as the search is
+        still the one it was built for; the page only if the sort is unchanged
+        too, since a sort change has already loaded the first page itself.
+        """
+        await asyncio.sleep(_SEARCH_DEBOUNCE)
+        async with self:
+            if generation != self._search_generation:
+                return
+            search = self.search_value
+            sort = (self.sort_value, self.sort_reverse)
+            count_query, page_query = self._count_query(), self._page_query()
+
+        def same_search() -> bool:
+            return generation == self._search_generation and search == self.search_value
+
+        def same_sort() -> bool:
+            return sort == (self.sort_value, self.sort_reverse)
+
+        total = await asyncio.to_thread(_read_count, count_query)
+        # Read without the lock: at worst a stale read costs the page query.
+        if not same_search():
+            return
+        page = None
+        if same_sort():
+            page = await asyncio.to_thread(_read_page, page_query, True)
+        async with self:
+            if not same_search():
+                return
+            self.total_items = total
+            if page is not None and same_sort():
+                self.page_number = 1
+                self.users, self._page_keys = page
 
     def get_user(self, user: Customer):
         self.current_user = user
@@ -160,26 +417,52 @@ class State(rx.State):
             ).first():
                 return rx.window_alert("User with this email already exists")
             self.current_user = Customer(
-                date=datetime.now().strftime("%Y-%m-%d %H:%M:%S"), **form_data
+                date=datetime.now().replace(microsecond=0), **form_data
             )
             session.add(self.current_user)
             session.commit()
             session.refresh(self.current_user)
-        self.load_entries()
+        self._patch_month_values(added=self.current_user)
+        self.total_items += self._matches(self.current_user.id)
+        if self._ranked():
+            # Every match's relevance may have changed, even if this one
+            # does not match.
+            self._reload_page()
+        else:
+            self._place(self.current_user)
         return rx.toast.info(
             f"User {self.current_user.name} has been added.", position="bottom-right"
         )
 
     def update_customer_to_db(self, form_data: dict):
+        matched = self._matches(self.current_user.id)
+        was_before = self._before_page(self.current_user.id)
         with rx.session() as session:
             customer = session.exec(
                 select(Customer).where(Customer.id == self.current_user.id)
             ).first()
+            previous = Customer(**customer.model_dump())
             form_data.pop("id", None)
-            customer.set(**form_data)
+            customer.sqlmodel_update(form_data)
             session.add(customer)
             session.commit()
-        self.load_entries()
+            session.refresh(customer)
+        self._patch_month_values(removed=previous, added=customer)
+        self.total_items += self._matches(customer.id) - matched
+        if self._ranked():
+            self._reload_page()
+        elif was_before:
+            # Unless it still sorts before the page, the rows shift up by one.
+            if not self._before_page(customer.id):
+                self._reload_page()
+        elif self._remove_from_page(customer.id):
+            # Let the following rows move up, then put the row back in if it
+            # still sorts onto this page.
+            self._fill_page()
+            if all(user.id != customer.id for user in self.users):
+                self._place(customer)
+        else:
+            self._place(customer)
         return rx.toast.info(
             f"User {self.current_user.name} has been modified.",
             position="bottom-right",
@@ -189,13 +472,58 @@ class State(rx.State):
         """Delete a customer from the database."""
         with rx.session() as session:
             customer = session.exec(select(Customer).where(Customer.id == id)).first()
+            matched = self._matches(id)
+            was_before = self._before_page(id)
             session.delete(customer)
             session.commit()
-        self.load_entries()
+        self._patch_month_values(removed=customer)
+        self.total_items -= matched
+        if self._ranked() or was_before:
+            self._reload_page()
+        elif self._remove_from_page(id):
+            self._fill_page()
         return rx.toast.info(
             f"User {customer.name} has been deleted.", position="bottom-right"
         )
 
+    async def import_csv(self, files: list[rx.UploadFile]):
+        """Bulk-import customers from uploaded CSV files."""
+        imported = skipped = 0
+        errors = []
+        for file in files:
+            try:
+                result = await asyncio.to_thread(import_customers, file.file)
+            except (ValueError, csv.Error) as error:
+                errors.append(f"{file.filename}: {error}")
+                continue
+            imported += result.imported
+            skipped += result.duplicates + result.invalid
+            errors.extend(f"{file.filename} {error}" for error in result.errors)
+        if imported:
+            # A bulk change: reload rather than patch.
+            self.load_entries()
+        message = f"Imported {imported} customers"
+        if skipped:
+            message += f", skipped {skipped} duplicate or invalid rows"
+        if errors:
+            return rx.toast.warning(
+                message, description="; ".join(errors[:3]), position="bottom-right"
+            )
+        return rx.toast.info(message, position="bottom-right")
+
+    def export_csv(self):
+        """Download the customers matching the search, in the table's order."""
+        params = urlencode(
+            {
+                "search": self.search_value,
+                "sort": self.sort_value,
+                "reverse": int(self.sort_reverse),
+            }
+        )
+        # The export is streamed by the backend; it is sent as an attachment, so
+        # the browser downloads it and stays on the page.
+        return rx.redirect(f"{get_config().api_url}{EXPORT_PATH}?{params}")
+
     @rx.var(cache=True)
     def payments_change(self) -> float:
         return _get_percentage_change(
@@ -0,0 +1,201 @@
+"""Bulk CSV import and export of customers.
+
+Both directions stream: the import reads the upload row by row and inserts in
+batches, the export writes rows to the response as the query yields them, so
+neither ever holds the whole file (or table) in memory.
+"""
+
+import csv
+import io
+import math
+import re
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import BinaryIO, Iterator
+
+import reflex as rx
+from sqlalchemy import insert, text
+from sqlmodel import func, select
+from starlette.requests import Request
+from starlette.responses import StreamingResponse
+
+from .models import SORT_FIELDS, STATUSES, Customer, sort_key
+from .search import apply_search, bulk_indexing, search_rank
+
+# Columns of an exported file, in order; an import needs all but "date".
+CSV_FIELDS = ("name", "email", "phone", "address", "payments", "date", "status")
+REQUIRED_FIELDS = tuple(name for name in CSV_FIELDS if name != "date")
+
+# Rows inserted per statement, and exported per chunk of the response.
+BATCH_SIZE = 5000
+
+# SQLite page cache (KiB) while importing: every row updates each of the
+# table's indexes, and past a few hundred thousand rows their pages no longer
+# fit the default 2 MiB cache.
+_IMPORT_CACHE_KIB = 256 * 1024
+
+# Invalid rows reported back in full; the rest are only counted.
+_MAX_ERRORS = 10
+
+_EMAIL = re.compile(r"[^@\s]+@[^@\s]+")
+_STATUSES = {status.lower(): status for status in STATUSES}
+
+
+@dataclass
+class ImportResult:
+    """What an import did with the rows of a file."""
+
+    imported: int = 0
+    duplicates: int = 0
+    invalid: int = 0
+    # The first few invalid rows, as "line N: reason".
+    errors: list[str] = field(default_factory=list)
+
+
+def parse_row(row: dict) -> dict:
+    """Validate a CSV row and convert it to Customer column values.
+
+    Raises ValueError describing the first problem found.
+    """
+    values = {name: (row.get(name) or "").strip() for name in CSV_FIELDS}
+    for name in REQUIRED_FIELDS:
+        if not values[name]:
+            raise ValueError(f"{name} is missing")
+    if not _EMAIL.fullmatch(values["email"]):
+        raise ValueError(f"invalid email {values['email']!r}")
+    try:
+        payments = float(values["payments"])
+    except ValueError:
+        raise ValueError(f"invalid payments {values['payments']!r}") from None
+    if not math.isfinite(payments) or payments < 0:
+        raise ValueError(f"invalid payments {values['payments']!r}")
+    status = _STATUSES.get(values["status"].lower())
+    if status is None:
+        raise ValueError(f"invalid status {values['status']!r}")
+    if values["date"]:
+        try:
+            date = datetime.fromisoformat(values["date"])
+        except ValueError:
+            raise ValueError(f"invalid date {values['date']!r}") from None
+        if date.tzinfo is not None:
+            # Customer dates are naive local time.
+            date = date.astimezone().replace(tzinfo=None)
+    else:
+        date = datetime.now()
+    return {
+        **values,
+        "payments": payments,
+        "date": date.replace(microsecond=0),
+        "status": status,
+    }
+
+
+@contextmanager
+def _import_cache(session):
+    """Enlarge the SQLite page cache of the session's connection for a block."""
+    if session.get_bind().dialect.name != "sqlite":
+        yield
+        return
+    previous = session.exec(text("PRAGMA cache_size")).one()[0]
+    session.exec(text(f"PRAGMA cache_size = -{_IMPORT_CACHE_KIB}"))
+    try:
+        yield
+    finally:
+        session.exec(text(f"PRAGMA cache_size = {previous}"))
+
+
+def import_customers(file: BinaryIO, batch_size: int = BATCH_SIZE) -> ImportResult:
+    """Import the customers of a CSV file, all in one transaction.
+
+    Rows whose email (case-insensitively) is already taken, by an existing
+    customer or an earlier row of the file, are skipped. Raises ValueError if
+    the file lacks a required column.
+    """
+    reader = csv.DictReader(io.TextIOWrapper(file, encoding="utf-8-sig", newline=""))
+    missing = [
+        name for name in REQUIRED_FIELDS if name not in (reader.fieldnames or ())
+    ]
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+
+    result = ImportResult()
+    table = Customer.__table__
+    with rx.session() as session:
+        with _import_cache(session), bulk_indexing(session):
+            # Loaded once: every row is then checked with a set lookup, not a query.
+            emails = set(session.exec(select(func.lower(Customer.email))))
+            connection = session.connection()
+            batch = []
+            for row in reader:
+                try:
+                    values = parse_row(row)
+                except ValueError as error:
+                    result.invalid += 1
+                    if len(result.errors) < _MAX_ERRORS:
+                        result.errors.append(f"line {reader.line_num}: {error}")
+                    continue
+                email = values["email"].lower()
+                if email in emails:
+                    result.duplicates += 1
+                    continue
+                emails.add(email)
+                batch.append(values)
+                if len(batch) == batch_size:
+                    connection.execute(insert(table), batch)
+                    result.imported += len(batch)
+                    batch = []
+            if batch:
+                connection.execute(insert(table), batch)
+                result.imported += len(batch)
+        session.commit()
+    return result
+
+
+def _export_query(search_value: str, sort_value: str, sort_reverse: bool):
+    """The matching customers' CSV columns, in the order the table shows them."""
+    if sort_value in SORT_FIELDS:
+        keys = [sort_key(sort_value), Customer.id]
+        if sort_reverse:
+            keys = [key.desc() for key in keys]
+    elif (rank := search_rank(search_value)) is not None:
+        keys = [rank, Customer.id]
+    else:
+        keys = [Customer.id]
+    columns = [getattr(Customer, name) for name in CSV_FIELDS]
+    return apply_search(select(*columns), Customer.id, search_value).order_by(*keys)
+
+
+def export_customers(
+    search_value: str = "", sort_value: str = "", sort_reverse: bool = False
+) -> Iterator[str]:
+    """The matching customers as CSV, in chunks of ``BATCH_SIZE`` rows."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_FIELDS)
+    query = _export_query(search_value, sort_value, sort_reverse)
+    with rx.session() as session:
+        result = session.exec(query.execution_options(yield_per=BATCH_SIZE))
+        for rows in result.partitions():
+            writer.writerows(rows)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+EXPORT_PATH = "/customers.csv"
+
+
+async def export_endpoint(request: Request) -> StreamingResponse:
+    """Stream the customers matching the ``search``/``sort``/``reverse`` params."""
+    params = request.query_params
+    return StreamingResponse(
+        export_customers(
+            params.get("search", ""),
+            params.get("sort", ""),
+            params.get("reverse") == "1",
+        ),
+        media_type="text/csv",
+        headers={"Content-Disposition": 'attachment; filename="customers.csv"'},
+    )
@@ -0,0 +1,36 @@
+from datetime import datetime
+
+import reflex as rx
+from sqlalchemy import Index
+from sqlmodel import DateTime, Field, func
+
+
+class Customer(rx.Model, table=True):
+    """The customer model."""
+
+    name: str
+    email: str
+    phone: str
+    address: str
+    # Naive local time, indexed for the monthly range queries.
+    date: datetime = Field(sa_type=DateTime, index=True)
+    payments: float
+    status: str
+
+
+# Delivery statuses a customer can have.
+STATUSES = ("Delivered", "Pending", "Cancelled")
+
+# Columns the table can be sorted by. Text columns sort case-insensitively.
+SORT_FIELDS = ("name", "email", "phone", "address", "payments", "date", "status")
+
+
+def sort_key(field: str, entity=Customer):
+    """The expression rows are ordered (and seeked) by for a sort column."""
+    column = getattr(entity, field)
+    return column if field in ("payments", "date") else func.lower(column)
+
+
+# One (sort key, id) index per sort column, so every page is an index seek.
+for _field in SORT_FIELDS:
+    Index(f"ix_customer_sort_{_field}", sort_key(_field), Customer.id)
@@ -0,0 +1,232 @@
+"""Full-text search index over the customer table.
+
+On SQLite the index is an FTS5 table, on Postgres a table of tsvectors with a
+GIN index. Either way it is kept in sync by triggers on the customer table, so
+every insert, update and delete (from this app or anywhere else) updates it in
+the same transaction. A search matches rows containing a word starting with
+each of the words typed, e.g. ``"jo exam"`` finds John at example.com, ranked
+by relevance.
+"""
+
+import re
+import threading
+from contextlib import contextmanager
+from typing import Any
+
+import reflex as rx
+from sqlalchemy import column, func, literal_column, table, text
+
+# Columns indexed for search, in the order they are concatenated.
+SEARCH_FIELDS = ("name", "email", "phone", "address", "payments", "date", "status")
+
+_fts = table("customer_search", column("rowid"), column("rank"))
+_documents = table("customer_search", column("id"), column("document"))
+
+_SQLITE_FIELDS = ", ".join(SEARCH_FIELDS)
+_SQLITE_NEW = ", ".join(f"new.{field}" for field in SEARCH_FIELDS)
+_SQLITE_OLD = ", ".join(f"old.{field}" for field in SEARCH_FIELDS)
+
+# A row in customer_search_paused stops the insert trigger; see bulk_indexing.
+_PAUSED_SCHEMA = "CREATE TABLE IF NOT EXISTS customer_search_paused (paused integer)"
+
+_SQLITE_SCHEMA = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS customer_search USING fts5(
+        {_SQLITE_FIELDS}, content='customer', content_rowid='id'
+    )
+    """,
+    _PAUSED_SCHEMA,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS customer_search_insert AFTER INSERT ON customer
+    WHEN NOT EXISTS (SELECT 1 FROM customer_search_paused)
+    BEGIN
+        INSERT INTO customer_search (rowid, {_SQLITE_FIELDS})
+        VALUES (new.id, {_SQLITE_NEW});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS customer_search_delete AFTER DELETE ON customer
+    BEGIN
+        INSERT INTO customer_search (customer_search, rowid, {_SQLITE_FIELDS})
+        VALUES ('delete', old.id, {_SQLITE_OLD});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS customer_search_update AFTER UPDATE ON customer
+    BEGIN
+        INSERT INTO customer_search (customer_search, rowid, {_SQLITE_FIELDS})
+        VALUES ('delete', old.id, {_SQLITE_OLD});
+        INSERT INTO customer_search (rowid, {_SQLITE_FIELDS})
+        VALUES (new.id, {_SQLITE_NEW});
+    END
+    """,
+]
+
+
+def _pg_document(row: str) -> str:
+    # Punctuation splits words, as FTS5 does, so "jo" finds "john@example.com"
+    # and "example" finds it too (the default parser keeps emails whole).
+    fields = ", ".join(f"{row}.{field}" for field in SEARCH_FIELDS)
+    return f"to_tsvector('simple', regexp_replace(concat_ws(' ', {fields}), '\\W+', ' ', 'g'))"
+
+
+_POSTGRES_SCHEMA = [
+    # Serializes workers racing to create the index on startup.
+    "SELECT pg_advisory_xact_lock(hashtext('customer_search'))",
+    """
+    CREATE TABLE IF NOT EXISTS customer_search (
+        id integer PRIMARY KEY REFERENCES customer (id) ON DELETE CASCADE,
+        document tsvector NOT NULL
+    )
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS ix_customer_search_document
+    ON customer_search USING GIN (document)
+    """,
+    _PAUSED_SCHEMA,
+    f"""
+    CREATE OR REPLACE FUNCTION customer_search_sync() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' AND EXISTS (SELECT 1 FROM customer_search_paused) THEN
+            RETURN NULL;
+        END IF;
+        INSERT INTO customer_search (id, document)
+        VALUES (NEW.id, {_pg_document("NEW")})
+        ON CONFLICT (id) DO UPDATE SET document = EXCLUDED.document;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS customer_search_sync ON customer",
+    """
+    CREATE TRIGGER customer_search_sync AFTER INSERT OR UPDATE ON customer
+    FOR EACH ROW EXECUTE FUNCTION customer_search_sync()
+    """,
+]
+
+
+def _create_sqlite_index(session):
+    exists = session.exec(
+        text("SELECT 1 FROM sqlite_master WHERE name = 'customer_search'")
+    ).first()
+    for statement in _SQLITE_SCHEMA:
+        session.exec(text(statement))
+    if not exists:
+        # Index the customers added before the triggers existed.
+        session.exec(
+            text("INSERT INTO customer_search (customer_search) VALUES ('rebuild')")
+        )
+
+
+_SQLITE_INDEX_AFTER = (
+    f"INSERT INTO customer_search (rowid, {_SQLITE_FIELDS}) "
+    f"SELECT id, {_SQLITE_FIELDS} FROM customer WHERE id > :after"
+)
+_POSTGRES_INDEX_AFTER = (
+    "INSERT INTO customer_search (id, document) "
+    f"SELECT customer.id, {_pg_document('customer')} FROM customer "
+    "WHERE customer.id > :after ON CONFLICT (id) DO NOTHING"
+)
+
+
+def _create_postgres_index(session):
+    for statement in _POSTGRES_SCHEMA:
+        session.exec(text(statement))
+    session.exec(text(_POSTGRES_INDEX_AFTER).bindparams(after=0))
+
+
+_lock = threading.Lock()
+_dialect: str | None = None
+
+
+def ensure_search_index() -> str:
+    """Create the search index if needed (once per process); return the dialect."""
+    global _dialect
+    with _lock:
+        if _dialect is None:
+            with rx.session() as session:
+                dialect = session.get_bind().dialect.name
+                if dialect == "sqlite":
+                    _create_sqlite_index(session)
+                elif dialect == "postgresql":
+                    _create_postgres_index(session)
+                session.commit()
+            _dialect = dialect
+        return _dialect
+
+
+@contextmanager
+def bulk_indexing(session):
+    """Index the customers a session inserts in the block all at once, at its end.
+
+    Updating the index row by row is most of the cost of a bulk insert. The
+    insert trigger is paused by a row in customer_search_paused, which only
+    this (uncommitted) transaction sees: other sessions keep indexing their
+    inserts, and if the transaction is rolled back the pause is too.
+    """
+    dialect = ensure_search_index()
+    if dialect not in ("sqlite", "postgresql"):
+        yield
+        return
+    # On SQLite this write also takes the database's write lock, so no other
+    # session inserts customers until the commit.
+    session.exec(text("INSERT INTO customer_search_paused VALUES (1)"))
+    after = session.exec(text("SELECT coalesce(max(id), 0) FROM customer")).one()[0]
+    yield
+    index_after = _SQLITE_INDEX_AFTER if dialect == "sqlite" else _POSTGRES_INDEX_AFTER
+    session.exec(text(index_after).bindparams(after=after))
+    session.exec(text("DELETE FROM customer_search_paused"))
+
+
+def search_terms(search_value: str) -> list[str]:
+    """The words of a search, lowercased, as the index splits them."""
+    return re.findall(r"\w+", search_value.lower())
+
+
+def _tsquery(terms: list[str]):
+    return func.to_tsquery("simple", " & ".join(f"{term}:*" for term in terms))
+
+
+def apply_search(query, customer_id, search_value: str):
+    """Restrict ``query`` to the customers matching ``search_value``.
+
+    ``customer_id`` is the id column of the customer table in ``query``.
+    """
+    terms = search_terms(search_value)
+    if not terms:
+        return query
+    dialect = ensure_search_index()
+    if dialect == "sqlite":
+        # Every term as a quoted prefix; FTS5 ANDs them.
+        match = " ".join(f'"{term}"*' for term in terms)
+        return query.join(_fts, _fts.c.rowid == customer_id).where(
+            literal_column("customer_search").match(match)
+        )
+    if dialect == "postgresql":
+        return query.join(_documents, _documents.c.id == customer_id).where(
+            _documents.c.document.op("@@")(_tsquery(terms))
+        )
+    # No full-text index on other databases: substring match on each term.
+    fields = [literal_column(f"customer.{field}") for field in SEARCH_FIELDS]
+    text_value = func.lower(func.concat_ws(" ", *fields))
+    for term in terms:
+        query = query.where(text_value.contains(term))
+    return query
+
+
+def search_rank(search_value: str) -> Any:
+    """Relevance of a match for a query built with ``apply_search``.
+
+    Ascending order puts the best matches first. None if there is nothing to
+    rank by.
+    """
+    terms = search_terms(search_value)
+    if not terms:
+        return None
+    dialect = ensure_search_index()
+    if dialect == "sqlite":
+        # bm25, where lower is better.
+        return _fts.c.rank
+    if dialect == "postgresql":
+        return -func.ts_rank(_documents.c.document, _tsquery(terms))
+    return None
@@ -1,5 +1,8 @@
 import reflex as rx
+from starlette.applications import Starlette
+from starlette.routing import Route
 
+from .backend.bulk import EXPORT_PATH, export_endpoint
 from .components.stats_cards import stats_cards_group
 from .views.navbar import navbar
 from .views.table import main_table
@@ -23,6 +26,7 @@ app = rx.App(
     theme=rx.theme(
         appearance="dark", has_background=True, radius="large", accent_color="grass"
     ),
+    api_transformer=Starlette(routes=[Route(EXPORT_PATH, export_endpoint)]),
 )
 
 app.add_page(
@@ -310,10 +310,91 @@ def _header_cell(text: str, icon: str):
     )
 
 
+def _pagination_view() -> rx.Component:
+    return rx.hstack(
+        rx.text(
+            "Page ",
+            rx.code(State.page_number),
+            f" of {State.total_pages}",
+            justify="end",
+        ),
+        rx.hstack(
+            rx.icon_button(
+                rx.icon("chevrons-left", size=18),
+                on_click=State.first_page,
+                opacity=rx.cond(State.page_number == 1, 0.6, 1),
+                color_scheme=rx.cond(State.page_number == 1, "gray", "accent"),
+                variant="soft",
+            ),
+            rx.icon_button(
+                rx.icon("chevron-left", size=18),
+                on_click=State.prev_page,
+                opacity=rx.cond(State.page_number == 1, 0.6, 1),
+                color_scheme=rx.cond(State.page_number == 1, "gray", "accent"),
+                variant="soft",
+            ),
+            rx.icon_button(
+                rx.icon("chevron-right", size=18),
+                on_click=State.next_page,
+                opacity=rx.cond(State.page_number == State.total_pages, 0.6, 1),
+                color_scheme=rx.cond(
+                    State.page_number == State.total_pages, "gray", "accent"
+                ),
+                variant="soft",
+            ),
+            rx.icon_button(
+                rx.icon("chevrons-right", size=18),
+                on_click=State.last_page,
+                opacity=rx.cond(State.page_number == State.total_pages, 0.6, 1),
+                color_scheme=rx.cond(
+                    State.page_number == State.total_pages, "gray", "accent"
+                ),
+                variant="soft",
+            ),
+            align="center",
+            spacing="2",
+            justify="end",
+        ),
+        spacing="5",
+        margin_top="1em",
+        align="center",
+        width="100%",
+        justify="end",
+    )
+
+
+def import_export_buttons() -> rx.Component:
+    return rx.hstack(
+        rx.upload(
+            rx.button(
+                rx.icon("upload", size=26),
+                rx.text("Import", size="4", display=["none", "none", "block"]),
+                size="3",
+                variant="surface",
+            ),
+            id="customers_csv",
+            accept={"text/csv": [".csv"]},
+            no_drag=True,
+            on_drop=State.import_csv(rx.upload_files(upload_id="customers_csv")),
+            border="none",
+            padding="0",
+        ),
+        rx.button(
+            rx.icon("download", size=26),
+            rx.text("Export", size="4", display=["none", "none", "block"]),
+            size="3",
+            variant="surface",
+            on_click=State.export_csv,
+        ),
+        spacing="3",
+    )
+
+
 def main_table():
     return rx.fragment(
         rx.flex(
             add_customer_button(),
+            import_export_buttons(),
             rx.spacer(),
             rx.cond(
                 State.sort_reverse,
@@ -373,4 +454,5 @@ def main_table():
             width="100%",
             on_mount=State.load_entries,
         ),
+        _pagination_view(),
     )
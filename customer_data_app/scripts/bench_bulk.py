@@ -0,0 +1,131 @@
+"""Benchmark the bulk CSV import and export of customers.
+
+Generates a CSV of fake customers (with a share of duplicate emails and
+invalid rows), imports it into a fresh SQLite database, then exports the whole
+table and a search over it. Each size runs in a fresh process so peak RSS is
+not shared between runs.
+
+Usage (from the ``customer_data_app`` directory):
+
+    python scripts/bench_bulk.py [--sizes 10000 100000 1000000]
+"""
+
+import argparse
+import csv
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+APP_DIR = Path(__file__).resolve().parent.parent
+
+_NAMES = ("Ann", "Bob", "Cara", "Dan", "Eve", "Finn", "Gia", "Hugo")
+_STATUSES = ("Delivered", "Pending", "Cancelled")
+
+
+def _make_csv(rows: int, path: Path):
+    """Fake customers; about 1% repeat an email and 1% are invalid."""
+    rng = random.Random(0)
+    start = datetime(2024, 1, 1)
+    with path.open("w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(
+            ("name", "email", "phone", "address", "payments", "date", "status")
+        )
+        for i in range(rows):
+            email = f"customer{rng.randrange(i) if i and rng.random() < 0.01 else i}"
+            writer.writerow(
+                (
+                    f"{rng.choice(_NAMES)} {i}",
+                    f"{email}@example.com",
+                    str(rng.randrange(10**9, 10**10)),
+                    f"{rng.randrange(1, 999)} Main St",
+                    "n/a" if rng.random() < 0.01 else f"{rng.uniform(1, 500):.2f}",
+                    (start + timedelta(minutes=rng.randrange(10**6))).isoformat(),
+                    rng.choice(_STATUSES),
+                )
+            )
+
+
+def _measure(path: str, database: str) -> dict:
+    """Import ``path`` into ``database`` and export it, in this process."""
+    os.environ["DATABASE_URL"] = f"sqlite:///{database}"
+    os.chdir(APP_DIR)
+    sys.path.insert(0, str(APP_DIR))
+
+    from customer_data.backend.bulk import export_customers, import_customers
+    from customer_data.backend.search import ensure_search_index
+    from reflex.model import get_engine
+    from sqlmodel import SQLModel
+
+    SQLModel.metadata.create_all(get_engine())
+    ensure_search_index()
+
+    stats = {}
+    start = time.perf_counter()
+    with Path(path).open("rb") as file:
+        result = import_customers(file)
+    stats["import_seconds"] = time.perf_counter() - start
+    stats["imported"] = result.imported
+    stats["skipped"] = result.duplicates + result.invalid
+
+    for name, search in (("export", ""), ("search_export", "ann")):
+        start = time.perf_counter()
+        size = sum(len(chunk) for chunk in export_customers(search, "name"))
+        stats[f"{name}_seconds"] = time.perf_counter() - start
+        stats[f"{name}_mib"] = size / (1024 * 1024)
+
+    # ru_maxrss is KiB on Linux and bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    stats["peak_rss_mib"] = (
+        peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    )
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000]
+    )
+    parser.add_argument("--measure", nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        sys.stdout.write(json.dumps(_measure(*args.measure)) + "\n")
+        return
+
+    out = sys.stdout
+    out.write(
+        f"{'rows':>10} {'imported':>10} {'import s':>10} {'export s':>10} "
+        f"{'search s':>10} {'peak RSS MiB':>14}\n"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            path = Path(tmp) / f"customers_{size}.csv"
+            _make_csv(size, path)
+            database = Path(tmp) / f"customers_{size}.db"
+            stats = json.loads(
+                subprocess.run(
+                    (sys.executable, __file__, "--measure", str(path), str(database)),
+                    capture_output=True,
+                    check=True,
+                    text=True,
+                ).stdout.splitlines()[-1]
+            )
+            out.write(
+                f"{size:>10} {stats['imported']:>10} "
+                f"{stats['import_seconds']:>10.2f} {stats['export_seconds']:>10.2f} "
+                f"{stats['search_export_seconds']:>10.2f} "
+                f"{stats['peak_rss_mib']:>14.1f}\n"
+            )
+
+
+if __name__ == "__main__":
+    main()
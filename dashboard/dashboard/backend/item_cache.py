@@ -0,0 +1,164 @@
+"""Process-wide, read-through cache of the parsed items.csv.
+
+The file is parsed once per change (keyed by path, mtime and size) into an
+immutable snapshot shared by every session. Sessions only keep the snapshot's
+key plus their own search/sort/page settings.
+"""
+
+import csv
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import NamedTuple
+
+items_csv = "items.csv"
+
+# Separates the searched fields of a row so a query never matches across two.
+_FIELD_SEPARATOR = "\x1f"
+
+
+@dataclass(frozen=True)
+class Item:
+    """The item class."""
+
+    name: str
+    payment: float
+    date: str
+    status: str
+
+
+# Sort key per column: payments by amount, everything else case-insensitively.
+_SORT_KEYS = {
+    "name": lambda item: item.name.lower(),
+    "payment": lambda item: item.payment,
+    "date": lambda item: item.date.lower(),
+    "status": lambda item: item.status.lower(),
+}
+
+
+@dataclass(frozen=True)
+class ItemsSnapshot:
+    """One parsed version of items.csv, with its sort orders precomputed."""
+
+    key: str
+    items: tuple[Item, ...]
+    # Column -> (ascending, descending) row orders, both stable.
+    orders: dict[str, tuple[tuple[int, ...], tuple[int, ...]]]
+    # Lowercased text of each row's fields, as they appear in the CSV.
+    search_text: tuple[str, ...]
+
+    def rows(self, search: str = "", sort: str = "", reverse: bool = False) -> list:
+        """Indices of the rows matching ``search``, ordered by ``sort``."""
+        if sort in self.orders:
+            rows = self.orders[sort][int(reverse)]
+        else:
+            rows = range(len(self.items))
+        search = search.lower().replace(_FIELD_SEPARATOR, "")
+        if search:
+            return [row for row in rows if search in self.search_text[row]]
+        return list(rows)
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    # Seconds spent parsing items.csv, in total and for the latest parse.
+    parse_seconds: float
+    last_parse_seconds: float
+
+
+def _parse(path: str, key: str) -> ItemsSnapshot:
+    with Path(path).open(mode="r", encoding="utf-8") as file:
+        rows = list(csv.DictReader(file))
+    items = tuple(
+        Item(
+            name=row["name"],
+            payment=float(row["payment"]),
+            date=row["date"],
+            status=row["status"],
+        )
+        for row in rows
+    )
+    orders = {
+        column: (
+            tuple(sorted(range(len(items)), key=lambda i: sort_key(items[i]))),
+            tuple(
+                sorted(
+                    range(len(items)),
+                    key=lambda i: sort_key(items[i]),
+                    reverse=True,
+                )
+            ),
+        )
+        for column, sort_key in _SORT_KEYS.items()
+    }
+    search_text = tuple(
+        _FIELD_SEPARATOR.join(row[column] for column in _SORT_KEYS).lower()
+        for row in rows
+    )
+    return ItemsSnapshot(key=key, items=items, orders=orders, search_text=search_text)
+
+
+# items.csv versions held at once, most recently used last. A table session
+# pages through row numbers of the version it loaded, so a replaced version
+# is only dropped once a couple of newer ones have been parsed.
+_MAX_SNAPSHOTS = 3
+
+_lock = threading.Lock()
+_snapshots: "OrderedDict[str, ItemsSnapshot]" = OrderedDict()
+_hits = 0
+_misses = 0
+_parse_seconds = 0.0
+_last_parse_seconds = 0.0
+
+
+def _items_key(path: str) -> str:
+    stat = Path(path).stat()
+    return f"{path}:{stat.st_mtime_ns}:{stat.st_size}"
+
+
+def load_items(path: str = items_csv) -> ItemsSnapshot:
+    """Return the shared snapshot, re-parsing the CSV only if it changed."""
+    global _hits, _misses, _parse_seconds, _last_parse_seconds
+    key = _items_key(path)
+    with _lock:
+        snapshot = _snapshots.get(key)
+        if snapshot is not None:
+            _hits += 1
+            _snapshots.move_to_end(key)
+            return snapshot
+        _misses += 1
+        start = time.perf_counter()
+        snapshot = _snapshots[key] = _parse(path, key)
+        _last_parse_seconds = time.perf_counter() - start
+        _parse_seconds += _last_parse_seconds
+        while len(_snapshots) > _MAX_SNAPSHOTS:
+            _snapshots.popitem(last=False)
+        return snapshot
+
+
+def get_items(key: str) -> ItemsSnapshot | None:
+    """The snapshot a table session was loaded with, looked up by its key.
+
+    If items.csv has been rewritten since and that version is no longer held,
+    this is None rather than the new version, whose row numbers would not match
+    the session's; the table stays empty until ``load_entries`` runs again.
+    """
+    global _hits
+    if not key:
+        return None
+    with _lock:
+        snapshot = _snapshots.get(key)
+        if snapshot is not None:
+            _hits += 1
+            return snapshot
+    snapshot = load_items(key.rsplit(":", 2)[0])
+    return snapshot if snapshot.key == key else None
+
+
+def cache_info() -> CacheInfo:
+    """Hit/miss counts and parse times of the items cache, for this process."""
+    with _lock:
+        return CacheInfo(_hits, _misses, _parse_seconds, _last_parse_seconds)
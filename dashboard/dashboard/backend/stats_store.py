@@ -0,0 +1,117 @@
+"""Shared daily rollups behind the overview charts.
+
+Users, revenue and orders are kept as one total per day. The store only ever
+appends days it has not seen yet (or adds to a day's totals), and each
+timeframe's chart series is derived from the rollups once per day and then
+served to every session as is.
+"""
+
+import datetime
+import random
+import threading
+
+METRICS = ("Users", "Revenue", "Orders")
+
+# Demo data: the range daily totals are drawn from, per metric.
+_DEMO_RANGES = {"Users": (100, 500), "Revenue": (1000, 5000), "Orders": (100, 500)}
+
+# Days of history kept, enough for the longest timeframe.
+_HISTORY_DAYS = 366
+
+# Timeframe -> (bucket size, number of buckets) shown in the charts.
+TIMEFRAMES = {
+    "Weekly": ("day", 7),
+    "Monthly": ("day", 31),
+    "Yearly": ("month", 12),
+}
+
+
+def _month_start(day: datetime.date) -> datetime.date:
+    return day.replace(day=1)
+
+
+def _months_back(day: datetime.date, months: int) -> datetime.date:
+    index = day.year * 12 + day.month - 1 - months
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+def _bucket_starts(today: datetime.date, timeframe: str) -> list[datetime.date]:
+    bucket, count = TIMEFRAMES[timeframe]
+    if bucket == "day":
+        return [today - datetime.timedelta(days=i) for i in range(count - 1, -1, -1)]
+    return [_months_back(today, i) for i in range(count - 1, -1, -1)]
+
+
+def timeframe_span(today: datetime.date, timeframe: str) -> str:
+    """The dates a timeframe covers, e.g. ``"May 01, 2024 - May 31, 2024"``."""
+    first = _bucket_starts(today, timeframe)[0]
+    return f"{first.strftime('%b %d, %Y')} - {today.strftime('%b %d, %Y')}"
+
+
+class DailyRollup:
+    """Per-day metric totals with memoized, downsampled timeframe views."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._days: dict[datetime.date, dict[str, int]] = {}
+        self._last_day: datetime.date | None = None
+        # (today, timeframe) -> metric -> chart points.
+        self._views: dict[tuple[datetime.date, str], dict[str, list[dict]]] = {}
+
+    def add(self, day: datetime.date, metric: str, value: int):
+        """Add ``value`` to a day's total, e.g. as events come in."""
+        with self._lock:
+            totals = self._days.setdefault(day, dict.fromkeys(METRICS, 0))
+            totals[metric] += value
+            self._views.clear()
+
+    def _fill(self, today: datetime.date):
+        """Generate demo totals for the days since the last one rolled up."""
+        first = today - datetime.timedelta(days=_HISTORY_DAYS - 1)
+        day = first
+        if self._last_day is not None:
+            day = max(first, self._last_day + datetime.timedelta(days=1))
+        while day <= today:
+            # Seeded by date, so every worker generates the same history.
+            rng = random.Random(day.toordinal())
+            self._days.setdefault(
+                day, {metric: rng.randint(*_DEMO_RANGES[metric]) for metric in METRICS}
+            )
+            day += datetime.timedelta(days=1)
+        self._last_day = today
+        for old in [day for day in self._days if day < first]:
+            del self._days[old]
+
+    def _build(self, today: datetime.date, timeframe: str) -> dict[str, list[dict]]:
+        starts = _bucket_starts(today, timeframe)
+        if TIMEFRAMES[timeframe][0] == "day":
+            key, label = (lambda day: day), "%m-%d"
+        else:
+            key, label = _month_start, "%b %Y"
+        totals = {start: dict.fromkeys(METRICS, 0) for start in starts}
+        for day, values in self._days.items():
+            group = totals.get(key(day))
+            if group is not None:
+                for metric in METRICS:
+                    group[metric] += values[metric]
+        return {
+            metric: [
+                {"Date": start.strftime(label), metric: totals[start][metric]}
+                for start in starts
+            ]
+            for metric in METRICS
+        }
+
+    def series(self, timeframe: str, metric: str, today: datetime.date) -> list[dict]:
+        """Chart points for ``metric`` over ``timeframe`` up to ``today``."""
+        with self._lock:
+            if self._last_day is None or today > self._last_day:
+                self._fill(today)
+                self._views.clear()
+            view = self._views.get((today, timeframe))
+            if view is None:
+                view = self._views[(today, timeframe)] = self._build(today, timeframe)
+            return view[metric]
+
+
+rollup = DailyRollup()
@@ -1,79 +1,44 @@
-import csv
-from dataclasses import dataclass
-from pathlib import Path
 from typing import List
 
 import reflex as rx
+from reflex.utils import console
 
-
-@dataclass
-class Item:
-    """The item class."""
-
-    name: str
-    payment: float
-    date: str
-    status: str
+from .item_cache import Item, cache_info, get_items, load_items
 
 
 class TableState(rx.State):
     """The state class."""
 
-    items: List[Item] = []
+    # Handle of the shared items snapshot this session was loaded with.
+    _items_key: str = ""
 
     search_value: str = ""
     sort_value: str = ""
     sort_reverse: bool = False
 
-    total_items: int = 0
     offset: int = 0
     limit: int = 12  # Number of rows per page
 
     @rx.event
     def set_search_value(self, value: str):
         self.search_value = value
+        self.offset = 0
 
     @rx.event
     def set_sort_value(self, value: str):
         self.sort_value = value
 
     @rx.var(cache=True)
-    def filtered_sorted_items(self) -> List[Item]:
-        items = self.items
-
-        # Filter items based on selected item
-        if self.sort_value:
-            if self.sort_value in ["payment"]:
-                items = sorted(
-                    items,
-                    key=lambda item: float(getattr(item, self.sort_value)),
-                    reverse=self.sort_reverse,
-                )
-            else:
-                items = sorted(
-                    items,
-                    key=lambda item: str(getattr(item, self.sort_value)).lower(),
-                    reverse=self.sort_reverse,
-                )
-
-        # Filter items based on search value
-        if self.search_value:
-            search_value = self.search_value.lower()
-            items = [
-                item
-                for item in items
-                if any(
-                    search_value in str(getattr(item, attr)).lower()
-                    for attr in [
-                        "name",
-                        "payment",
-                        "date",
-                        "status",
-                    ]
-                )
-            ]
-
-        return items
+    def _filtered_sorted_rows(self) -> List[int]:
+        # Indices into the shared snapshot; the items themselves are not copied.
+        snapshot = get_items(self._items_key)
+        if snapshot is None:
+            return []
+        return snapshot.rows(self.search_value, self.sort_value, self.sort_reverse)
+
+    @rx.var(cache=True)
+    def total_items(self) -> int:
+        return len(self._filtered_sorted_rows)
 
     @rx.var(cache=True)
     def page_number(self) -> int:
@@ -82,14 +47,16 @@ class TableState(rx.State):
     @rx.var(cache=True)
     def total_pages(self) -> int:
         return (self.total_items // self.limit) + (
-            1 if self.total_items % self.limit else 1
+            1 if self.total_items % self.limit else 0
         )
 
     @rx.var(cache=True, initial_value=[])
     def get_current_page(self) -> list[Item]:
-        start_index = self.offset
-        end_index = start_index + self.limit
-        return self.filtered_sorted_items[start_index:end_index]
+        snapshot = get_items(self._items_key)
+        if snapshot is None:
+            return []
+        rows = self._filtered_sorted_rows[self.offset : self.offset + self.limit]
+        return [snapshot.items[row] for row in rows]
 
     def prev_page(self):
         if self.page_number > 1:
@@ -103,14 +70,17 @@ class TableState(rx.State):
         self.offset = 0
 
     def last_page(self):
-        self.offset = (self.total_pages - 1) * self.limit
+        self.offset = max(self.total_pages - 1, 0) * self.limit
 
     def load_entries(self):
-        with Path("items.csv").open(mode="r", encoding="utf-8") as file:
-            reader = csv.DictReader(file)
-            self.items = [Item(**row) for row in reader]
-            self.total_items = len(self.items)
+        self._items_key = load_items().key
+        # Shown with `reflex run --loglevel debug`.
+        info = cache_info()
+        console.debug(
+            f"items.csv cache: {info.hits} hits, {info.misses} misses, "
+            f"{info.parse_seconds * 1000:.1f} ms parsing "
+            f"({info.last_parse_seconds * 1000:.1f} ms last)"
+        )
 
     def toggle_sort(self):
         self.sort_reverse = not self.sort_reverse
-        self.load_entries()
@@ -1,7 +1,5 @@
 """The overview page of the app."""
 
-import datetime
-
 import reflex as rx
 
 from .. import styles
@@ -26,9 +24,9 @@ def _time_data() -> rx.Component:
     return rx.hstack(
         rx.tooltip(
             rx.icon("info", size=20),
-            content=f"{(datetime.datetime.now() - datetime.timedelta(days=30)).strftime('%b %d, %Y')} - {datetime.datetime.now().strftime('%b %d, %Y')}",
+            content=StatsState.timeframe_span,
         ),
-        rx.text("Last 30 days", size="4", weight="medium"),
+        rx.text(StatsState.timeframe_label, size="4", weight="medium"),
         align="center",
         spacing="2",
         display=["none", "none", "flex"],
@@ -45,7 +43,7 @@ def tab_content_header() -> rx.Component:
     )
 
 
-@template(route="/", title="Overview", on_load=StatsState.randomize_data)
+@template(route="/", title="Overview", on_load=StatsState.load_stats)
 def index() -> rx.Component:
     """The overview page.
 
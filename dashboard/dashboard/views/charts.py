@@ -1,21 +1,45 @@
 import datetime
-import random
 
 import reflex as rx
 from reflex.components.radix.themes.base import (
     LiteralAccentColor,
 )
 
+from ..backend.stats_store import TIMEFRAMES, rollup, timeframe_span
+
+# Device split for the visitors pie chart.
+_DEVICE_DATA = [
+    {"name": "Desktop", "value": 23, "fill": "var(--blue-8)"},
+    {"name": "Mobile", "value": 47, "fill": "var(--green-8)"},
+    {"name": "Tablet", "value": 25, "fill": "var(--purple-8)"},
+    {"name": "Other", "value": 5, "fill": "var(--red-8)"},
+]
+_YEARLY_DEVICE_DATA = [
+    {"name": "Desktop", "value": 34, "fill": "var(--blue-8)"},
+    {"name": "Mobile", "value": 46, "fill": "var(--green-8)"},
+    {"name": "Tablet", "value": 21, "fill": "var(--purple-8)"},
+    {"name": "Other", "value": 9, "fill": "var(--red-8)"},
+]
+
+_TIMEFRAME_LABELS = {
+    "Weekly": "Last 7 days",
+    "Monthly": "Last 30 days",
+    "Yearly": "Last 12 months",
+}
+
+
+def _series(today: str, timeframe: str, metric: str) -> list[dict]:
+    if not today:
+        return []
+    return rollup.series(timeframe, metric, datetime.date.fromisoformat(today))
+
 
 class StatsState(rx.State):
     area_toggle: bool = True
     selected_tab: str = "users"
     timeframe: str = "Monthly"
-    users_data = []
-    revenue_data = []
-    orders_data = []
-    device_data = []
-    yearly_device_data = []
+    # The day the series were loaded for; a new day refreshes them.
+    _today: str = ""
 
     @rx.event
     def set_timeframe(self, value: str):
@@ -28,53 +52,36 @@ class StatsState(rx.State):
     def toggle_areachart(self):
         self.area_toggle = not self.area_toggle
 
-    def randomize_data(self):
-        # If data is already populated, don't randomize
-        if self.users_data:
-            return
-
-        for i in range(30, -1, -1):  # Include today's data
-            self.revenue_data.append(
-                {
-                    "Date": (
-                        datetime.datetime.now() - datetime.timedelta(days=i)
-                    ).strftime("%m-%d"),
-                    "Revenue": random.randint(1000, 5000),
-                }
-            )
-        for i in range(30, -1, -1):
-            self.orders_data.append(
-                {
-                    "Date": (
-                        datetime.datetime.now() - datetime.timedelta(days=i)
-                    ).strftime("%m-%d"),
-                    "Orders": random.randint(100, 500),
-                }
-            )
-
-        for i in range(30, -1, -1):
-            self.users_data.append(
-                {
-                    "Date": (
-                        datetime.datetime.now() - datetime.timedelta(days=i)
-                    ).strftime("%m-%d"),
-                    "Users": random.randint(100, 500),
-                }
-            )
-
-        self.device_data = [
-            {"name": "Desktop", "value": 23, "fill": "var(--blue-8)"},
-            {"name": "Mobile", "value": 47, "fill": "var(--green-8)"},
-            {"name": "Tablet", "value": 25, "fill": "var(--purple-8)"},
-            {"name": "Other", "value": 5, "fill": "var(--red-8)"},
-        ]
-
-        self.yearly_device_data = [
-            {"name": "Desktop", "value": 34, "fill": "var(--blue-8)"},
-            {"name": "Mobile", "value": 46, "fill": "var(--green-8)"},
-            {"name": "Tablet", "value": 21, "fill": "var(--purple-8)"},
-            {"name": "Other", "value": 9, "fill": "var(--red-8)"},
-        ]
+    def load_stats(self):
+        self._today = datetime.date.today().isoformat()
+
+    # The series are shared views of the rollup store, computed once per day
+    # and timeframe for all sessions.
+    @rx.var(cache=True)
+    def users_data(self) -> list[dict]:
+        return _series(self._today, self.timeframe, "Users")
+
+    @rx.var(cache=True)
+    def revenue_data(self) -> list[dict]:
+        return _series(self._today, self.timeframe, "Revenue")
+
+    @rx.var(cache=True)
+    def orders_data(self) -> list[dict]:
+        return _series(self._today, self.timeframe, "Orders")
+
+    @rx.var(cache=True)
+    def device_data(self) -> list[dict]:
+        return _YEARLY_DEVICE_DATA if self.timeframe == "Yearly" else _DEVICE_DATA
+
+    @rx.var(cache=True)
+    def timeframe_label(self) -> str:
+        return _TIMEFRAME_LABELS.get(self.timeframe, "")
+
+    @rx.var(cache=True)
+    def timeframe_span(self) -> str:
+        if not self._today:
+            return ""
+        return timeframe_span(datetime.date.fromisoformat(self._today), self.timeframe)
 
 
 def area_toggle() -> rx.Component:
@@ -255,44 +262,26 @@ def orders_chart() -> rx.Component:
 
 
 def pie_chart() -> rx.Component:
-    return rx.cond(
-        StatsState.timeframe == "Yearly",
-        rx.recharts.pie_chart(
-            rx.recharts.pie(
-                data=StatsState.yearly_device_data,
-                data_key="value",
-                name_key="name",
-                cx="50%",
-                cy="50%",
-                padding_angle=1,
-                inner_radius="70",
-                outer_radius="100",
-                label=True,
-            ),
-            rx.recharts.legend(),
-            height=300,
-        ),
-        rx.recharts.pie_chart(
-            rx.recharts.pie(
-                data=StatsState.device_data,
-                data_key="value",
-                name_key="name",
-                cx="50%",
-                cy="50%",
-                padding_angle=1,
-                inner_radius="70",
-                outer_radius="100",
-                label=True,
-            ),
-            rx.recharts.legend(),
-            height=300,
+    return rx.recharts.pie_chart(
+        rx.recharts.pie(
+            data=StatsState.device_data,
+            data_key="value",
+            name_key="name",
+            cx="50%",
+            cy="50%",
+            padding_angle=1,
+            inner_radius="70",
+            outer_radius="100",
+            label=True,
         ),
+        rx.recharts.legend(),
+        height=300,
     )
 
 
 def timeframe_select() -> rx.Component:
     return rx.select(
-        ["Monthly", "Yearly"],
+        list(TIMEFRAMES),
         default_value="Monthly",
         value=StatsState.timeframe,
         variant="surface",
@@ -0,0 +1,67 @@
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Callable, Dict
+
+import numpy as np
+
+# Bump when the layout of the cached arrays changes.
+CACHE_VERSION = 1
+
+
+def cache_dir(source: Path) -> Path:
+    """Directory holding the binary caches of ``source`` (e.g. nbastats.csv.cache)."""
+    return source.with_name(f"{source.name}.cache")
+
+
+def _entry_name(source: Path) -> str:
+    stat = source.stat()
+    return f"v{CACHE_VERSION}-{stat.st_mtime_ns}-{stat.st_size}"
+
+
+def _load(entry: Path) -> Dict[str, np.ndarray]:
+    # mmap_mode maps each array from the page cache instead of reading it in.
+    return {
+        path.stem: np.load(path, mmap_mode="r", allow_pickle=False)
+        for path in entry.glob("*.npy")
+    }
+
+
+def _save(root: Path, entry: Path, arrays: Dict[str, np.ndarray]):
+    root.mkdir(exist_ok=True)
+    tmp = Path(tempfile.mkdtemp(dir=root, prefix=".tmp-"))
+    try:
+        for name, array in arrays.items():
+            np.save(tmp / f"{name}.npy", array, allow_pickle=False)
+        # Publishing the entry is one rename, so readers never see a partial
+        # cache; if another worker won the race its entry is just as good.
+        tmp.rename(entry)
+    except OSError:
+        shutil.rmtree(tmp, ignore_errors=True)
+        if not entry.exists():
+            raise
+    for stale in root.iterdir():
+        if stale != entry and not stale.name.startswith("."):
+            shutil.rmtree(stale, ignore_errors=True)
+
+
+def load_or_build(
+    source: Path, build: Callable[[], Dict[str, np.ndarray]]
+) -> Dict[str, np.ndarray]:
+    """Memory-map the cached arrays derived from ``source``, building them if needed.
+
+    The cache entry is keyed on the source's mtime and size, so editing the
+    source file invalidates it automatically.
+    """
+    root = cache_dir(source)
+    entry = root / _entry_name(source)
+    if entry.is_dir():
+        return _load(entry)
+
+    arrays = build()
+    try:
+        _save(root, entry, arrays)
+    except OSError:
+        # e.g. a read-only checkout: serve the freshly built arrays from memory.
+        return arrays
+    return _load(entry)
@@ -0,0 +1,148 @@
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+from .columnar_cache import load_or_build
+from .player import MISSING_SALARY, Player
+from .player_table import PlayerTable
+from .search_index import SearchIndex
+
+nba_csv = "nbastats.csv"
+
+# Parse every column straight into its final type instead of letting pandas
+# infer dtypes (and fall back to object columns) on each load.
+_csv_dtypes = {
+    "name": str,
+    "team": str,
+    "number": "int32",
+    "position": str,
+    "age": "int32",
+    "height": str,
+    "weight": "int32",
+    "college": str,
+    "salary": "float64",
+}
+
+
+@dataclass(frozen=True)
+class Dataset:
+    """An immutable, process-wide snapshot of the player data.
+
+    Sessions only keep the ``key`` of the snapshot they were loaded with, so the
+    rows themselves are stored once per process instead of once per session.
+    Every array is memory-mapped from the columnar cache of the CSV.
+    """
+
+    key: str
+    columns: Dict[str, np.ndarray]
+    table: PlayerTable
+    search: SearchIndex
+
+    def __len__(self) -> int:
+        return self.table.size
+
+    def players(self, rows: np.ndarray) -> list[Player]:
+        """Build Player records for the given rows, column-wise."""
+        columns = [self.columns[name][rows].tolist() for name in Player.__slots__]
+        return list(map(Player, *columns))
+
+
+# Datasets of the last few versions of the CSV, oldest first. A session's row
+# indices (its cached filter/sort result) point into the version it loaded, so
+# that version has to stay reachable after the file changes until the session
+# reloads; the arrays are memory-mapped, so an old version costs little.
+_MAX_DATASETS = 4
+
+_lock = threading.Lock()
+_datasets: "OrderedDict[str, Dataset]" = OrderedDict()
+
+
+def _dataset_key(path: str) -> str:
+    stat = Path(path).stat()
+    return f"{path}:{stat.st_mtime_ns}:{stat.st_size}"
+
+
+def read_players_csv(path: str) -> pd.DataFrame:
+    """Parse the stats CSV into typed columns with missing values normalized."""
+    df = pd.read_csv(path, dtype=_csv_dtypes)
+    for column, dtype in _csv_dtypes.items():
+        if dtype is str:
+            df[column] = df[column].fillna("")
+    df["salary"] = df["salary"].fillna(MISSING_SALARY).astype("int64")
+    return df
+
+
+def read_players_columns(path: str) -> Dict[str, np.ndarray]:
+    """The typed CSV columns as plain (fixed-width for text) NumPy arrays."""
+    df = read_players_csv(path)
+    return {
+        name: df[name].to_numpy(dtype=str if _csv_dtypes[name] is str else None)
+        for name in Player.__slots__
+    }
+
+
+def _build_arrays(path: str) -> Dict[str, np.ndarray]:
+    columns = read_players_columns(path)
+    fields = [columns[name] for name in Player.__slots__]
+    # Unknown salaries are blank in the table, so they should not be searchable.
+    salary = columns["salary"]
+    fields[Player.__slots__.index("salary")] = np.where(
+        salary == MISSING_SALARY, "", salary.astype(str)
+    )
+    parts = {
+        "column": columns,
+        "table": PlayerTable.build(columns).arrays,
+        "search": SearchIndex.build(fields).arrays,
+    }
+    return {
+        f"{part}.{name}": array
+        for part, arrays in parts.items()
+        for name, array in arrays.items()
+    }
+
+
+def _read_dataset(path: str, key: str) -> Dataset:
+    arrays = load_or_build(Path(path), lambda: _build_arrays(path))
+    parts: Dict[str, Dict[str, np.ndarray]] = {"column": {}, "table": {}, "search": {}}
+    for qualified, array in arrays.items():
+        part, name = qualified.split(".", 1)
+        parts[part][name] = array
+    return Dataset(
+        key=key,
+        columns=parts["column"],
+        table=PlayerTable(parts["table"]),
+        search=SearchIndex(parts["search"]),
+    )
+
+
+def load_dataset(path: str = nba_csv) -> Dataset:
+    """Return the shared dataset, re-reading the CSV only if it changed on disk."""
+    key = _dataset_key(path)
+    with _lock:
+        dataset = _datasets.get(key)
+        if dataset is None:
+            dataset = _datasets[key] = _read_dataset(path, key)
+            while len(_datasets) > _MAX_DATASETS:
+                _datasets.popitem(last=False)
+        _datasets.move_to_end(key)
+        return dataset
+
+
+def get_dataset(key: str) -> Dataset | None:
+    """The exact dataset version a session loaded, by its key.
+
+    None if that version is gone: the CSV has changed since and its dataset was
+    dropped (or never read by this worker). Row indices from another version
+    would pick the wrong players, so the session has to ``load_entries`` again.
+    """
+    if not key:
+        return None
+    dataset = _datasets.get(key)
+    if dataset is None:
+        dataset = load_dataset(key.rsplit(":", 2)[0])
+    return dataset if dataset.key == key else None
@@ -1,8 +1,10 @@
 from dataclasses import dataclass
-from typing import Union
 
+# Salary stored for players whose salary is unknown (empty in the CSV).
+MISSING_SALARY = -1
 
-@dataclass
+
+@dataclass(slots=True)
 class Player:
     """The player class."""
 
@@ -14,4 +16,4 @@ class Player:
     height: str
     weight: int
     college: str
-    salary: Union[int, str]  # Can also be a string for the NaN values
+    salary: int  # MISSING_SALARY when unknown
@@ -0,0 +1,304 @@
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from .player import MISSING_SALARY, Player
+
+
+def _encode(column: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Encode a column as integer codes and its unique values."""
+    codes, uniques = pd.factorize(column)
+    return codes, np.asarray(uniques, dtype=str)
+
+
+def _sort_orders(column: np.ndarray) -> np.ndarray:
+    """Ascending and descending sort permutations of a column, stacked.
+
+    Numeric columns sort by value, text columns case-insensitively. Both
+    permutations are stable, matching ``sorted(..., reverse=...)``.
+    """
+    if np.issubdtype(column.dtype, np.number):
+        keys = column
+    else:
+        keys, _ = pd.factorize(np.char.lower(column), sort=True)
+    ascending = np.argsort(keys, kind="stable")
+    descending = np.argsort(-keys, kind="stable")
+    return np.stack([ascending, descending])
+
+
+def _category_bitsets(codes: np.ndarray, categories: int) -> np.ndarray:
+    """One packed bitset per category (a row each), with its rows' bits set."""
+    bits = np.zeros((categories, (len(codes) + 7) // 8), dtype=np.uint8)
+    for code in range(categories):
+        bits[code] = np.packbits(codes == code)
+    return bits
+
+
+def _inverse(orders: np.ndarray) -> np.ndarray:
+    ranks = np.empty_like(orders)
+    positions = np.arange(orders.shape[1])
+    for order, rank in zip(orders, ranks, strict=True):
+        rank[order] = positions
+    return ranks
+
+
+# Number of equal-width bins in the salary histogram.
+_SALARY_BINS = 10
+
+
+class PlayerTable:
+    """Columnar view of the roster: one NumPy array per column.
+
+    The stats charts filter on the same teams/colleges/positions/age/salary
+    clauses, so the filter mask is computed once and every chart aggregation
+    is a vectorized group-by over that mask. Sort orders for the table are
+    computed once at load time.
+
+    Team, college and position selections are packed bitsets (one bit per
+    row): each category has its own bitset, so selecting or deselecting a
+    category is a single OR / AND-NOT on the current selection.
+
+    All state lives in plain arrays (see ``arrays``), so a table can be saved
+    to and memory-mapped back from the columnar cache.
+    """
+
+    # Selector list name -> categorical column it filters on.
+    categories = {"teams": "team", "colleges": "college", "positions": "position"}
+
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        self.arrays = arrays
+        self.age = arrays["age"]
+        self.salary = arrays["salary"]
+        self.size = len(self.age)
+        self.team_codes, self.teams = arrays["team_codes"], arrays["teams"]
+        self.college_codes, self.colleges = arrays["college_codes"], arrays["colleges"]
+        self.position_codes, self.positions = (
+            arrays["position_codes"],
+            arrays["positions"],
+        )
+        self._category_index = {
+            list_name: {
+                category: index
+                for index, category in enumerate(arrays[list_name].tolist())
+            }
+            for list_name in self.categories
+        }
+
+    @classmethod
+    def build(cls, columns: Dict[str, np.ndarray]) -> "PlayerTable":
+        """Derive the table arrays from the typed CSV columns."""
+        salary = columns["salary"].astype(float)
+        salary[salary == MISSING_SALARY] = np.nan
+        arrays = {"age": columns["age"].astype(float), "salary": salary}
+        for list_name, column in cls.categories.items():
+            codes, uniques = _encode(columns[column])
+            arrays[f"{column}_codes"] = codes
+            arrays[list_name] = uniques
+            arrays[f"{list_name}_bits"] = _category_bitsets(codes, len(uniques))
+
+        # Precompute a sort permutation per column (and its inverse, the rank of
+        # each row) so sorting a search result is a gather, not a sort by key.
+        for column in Player.__slots__:
+            orders = _sort_orders(columns[column])
+            arrays[f"order_{column}"] = orders
+            arrays[f"rank_{column}"] = _inverse(orders)
+        return cls(arrays)
+
+    def sorted_rows(
+        self, column: str, reverse: bool, rows: np.ndarray | None = None
+    ) -> np.ndarray:
+        """Row indices (all, or just ``rows``) ordered by ``column``."""
+        if f"order_{column}" not in self.arrays:
+            # No sort column selected: keep the CSV order.
+            return np.arange(self.size) if rows is None else rows
+        order = self.arrays[f"order_{column}"][int(reverse)]
+        if rows is None:
+            return order
+        if len(rows) > self.size // 16:
+            # Dense result: one filtering pass over the permutation beats a sort.
+            member = np.zeros(self.size, dtype=bool)
+            member[rows] = True
+            return order[member[order]]
+        ranks = self.arrays[f"rank_{column}"][int(reverse)]
+        return rows[np.argsort(ranks[rows])]
+
+    def _empty_bits(self) -> np.ndarray:
+        return np.zeros((self.size + 7) // 8, dtype=np.uint8)
+
+    def category_bits(self, list_name: str, item: str) -> np.ndarray:
+        """Packed bitset of the rows in one team/college/position."""
+        index = self._category_index[list_name].get(item)
+        if index is None:
+            return self._empty_bits()
+        return self.arrays[f"{list_name}_bits"][index]
+
+    def selection_bits(self, list_name: str, items: List) -> np.ndarray:
+        """Packed bitset of the rows in any of the selected categories."""
+        bits = self._empty_bits()
+        for item in items:
+            bits |= self.category_bits(list_name, item)
+        return bits
+
+    def selection(self, selected_items: Dict[str, List]) -> Dict[str, np.ndarray]:
+        """Packed selection bitsets for every selector list."""
+        return {
+            list_name: self.selection_bits(list_name, selected_items[list_name])
+            for list_name in self.categories
+        }
+
+    def mask(
+        self,
+        selection: Dict[str, np.ndarray],
+        age: tuple[int, int],
+        salary: tuple[int, int],
+    ) -> np.ndarray:
+        """Boolean mask of the players matching the stats filters."""
+        selected = np.bitwise_and.reduce(
+            [selection[list_name] for list_name in self.categories]
+        )
+        # NaN ages/salaries fail both comparisons, so they are excluded here.
+        return (
+            np.unpackbits(selected, count=self.size).view(bool)
+            & (self.age >= age[0])
+            & (self.age <= age[1])
+            & (self.salary >= salary[0])
+            & (self.salary <= salary[1])
+        )
+
+    @staticmethod
+    def _group_average(
+        codes: np.ndarray, uniques: np.ndarray, values: np.ndarray, mask: np.ndarray
+    ) -> list[tuple[str, float]]:
+        codes, values = codes[mask], values[mask]
+        totals = np.bincount(codes, weights=values, minlength=len(uniques))
+        counts = np.bincount(codes, minlength=len(uniques))
+        # Keep groups in the order they first appear among the filtered players.
+        present, first_seen = np.unique(codes, return_index=True)
+        ordered = present[np.argsort(first_seen)]
+        return [
+            (str(uniques[code]), round(float(totals[code] / counts[code]), 2))
+            for code in ordered
+        ]
+
+    @staticmethod
+    def _group_quartiles(
+        codes: np.ndarray, uniques: np.ndarray, values: np.ndarray, mask: np.ndarray
+    ) -> list[tuple[str, list[float]]]:
+        codes, values = codes[mask], values[mask]
+        # Keep groups in the order they first appear among the filtered players.
+        present, first_seen = np.unique(codes, return_index=True)
+        # Sort by group, then value, so each group is a contiguous sorted run.
+        order = np.lexsort((values, codes))
+        values = values[order]
+        counts = np.bincount(codes, minlength=len(uniques))[present]
+        starts = np.cumsum(counts) - counts
+        quartiles = []
+        for fraction in (0.25, 0.5, 0.75):
+            # Linear interpolation between closest ranks, like np.quantile.
+            position = starts + fraction * (counts - 1)
+            low = np.floor(position).astype(int)
+            high = np.ceil(position).astype(int)
+            quartiles.append(
+                values[low] + (values[high] - values[low]) * (position - low)
+            )
+        quartiles = np.round(np.stack(quartiles, axis=1), 2).tolist()
+        return [
+            (str(uniques[present[index]]), quartiles[index])
+            for index in np.argsort(first_seen)
+        ]
+
+    def chart_data(
+        self, mask: np.ndarray, age: tuple[int, int], salary: tuple[int, int]
+    ) -> Dict[str, list[dict]]:
+        """All stats chart series, computed from a single filter mask."""
+        ages = self.age[mask].astype(int) - age[0]
+        span = age[1] - age[0] + 1
+        age_totals = np.bincount(ages, weights=self.salary[mask], minlength=span)
+        age_counts = np.bincount(ages, minlength=span)
+
+        def _averages(key: str, label: str, codes, uniques, values) -> list[dict]:
+            return [
+                {key: group, label: average}
+                for group, average in self._group_average(codes, uniques, values, mask)
+            ]
+
+        def _quartiles(key: str, codes, uniques) -> list[dict]:
+            return [
+                {
+                    key: group,
+                    "first quartile": first,
+                    "median": median,
+                    "third quartile": third,
+                }
+                for group, (first, median, third) in self._group_quartiles(
+                    codes, uniques, self.salary, mask
+                )
+            ]
+
+        age_salary = [
+            {
+                "age": age[0] + offset,
+                "average salary": round(
+                    float(age_totals[offset] / max(age_counts[offset], 1)), 2
+                ),
+            }
+            for offset in range(span)
+        ]
+
+        # Least-squares salary ~ age line over the filtered players.
+        trend = age_salary
+        if len(np.unique(ages)) > 1:
+            slope, intercept = np.polyfit(ages + age[0], self.salary[mask], 1)
+            trend = [
+                {**point, "trend": round(float(intercept + slope * point["age"]), 2)}
+                for point in age_salary
+            ]
+
+        counts, edges = np.histogram(
+            self.salary[mask], bins=_SALARY_BINS, range=(salary[0], salary[1])
+        )
+        histogram = [
+            {
+                "salary": f"{edges[index] / 1e6:.1f}M-{edges[index + 1] / 1e6:.1f}M",
+                "players": int(count),
+            }
+            for index, count in enumerate(counts)
+        ]
+
+        return {
+            "age_salary": age_salary,
+            "age_salary_trend": trend,
+            "salary_histogram": histogram,
+            "team_salary_quartiles": _quartiles("team", self.team_codes, self.teams),
+            "position_salary_quartiles": _quartiles(
+                "position", self.position_codes, self.positions
+            ),
+            "position_salary": _averages(
+                "position",
+                "average salary",
+                self.position_codes,
+                self.positions,
+                self.salary,
+            ),
+            "team_salary": _averages(
+                "team", "average salary", self.team_codes, self.teams, self.salary
+            ),
+            "college_salary": _averages(
+                "college",
+                "average salary",
+                self.college_codes,
+                self.colleges,
+                self.salary,
+            ),
+            "team_age": _averages(
+                "team", "average age", self.team_codes, self.teams, self.age
+            ),
+            "position_age": _averages(
+                "position",
+                "average age",
+                self.position_codes,
+                self.positions,
+                self.age,
+            ),
+        }
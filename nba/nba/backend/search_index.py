@@ -0,0 +1,120 @@
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+# Separates the searched fields of a row so a query never matches across two.
+_FIELD_SEPARATOR = "\x1f"
+_GRAM = 3
+
+
+def _grams(text: str, size: int = _GRAM) -> set[str]:
+    return {text[i : i + size] for i in range(len(text) - size + 1)}
+
+
+def _indexed_grams(text: str) -> set[str]:
+    # Short grams are indexed too so one- and two-character queries are a lookup.
+    return set().union(*(_grams(text, size) for size in range(1, _GRAM + 1)))
+
+
+class SearchIndex:
+    """N-gram inverted index for case-insensitive substring search.
+
+    Every 1-, 2- and 3-gram of the searched fields has a sorted posting list of
+    row indices. Queries of up to three characters are a single lookup; longer
+    queries intersect the posting lists of their trigrams and only verify the
+    surviving candidates.
+
+    The index is four flat arrays (see ``arrays``): the sorted grams, offsets
+    into the concatenated posting lists, the posting lists themselves and the
+    UTF-8 encoded rows used for verification.
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        self.arrays = arrays
+        self._haystack = arrays["haystack"]
+        self._grams = arrays["grams"]
+        self._offsets = arrays["offsets"]
+        self._rows = arrays["rows"]
+        self.size = len(self._haystack)
+
+    @classmethod
+    def build(cls, fields: list[np.ndarray]) -> "SearchIndex":
+        """Index the given string columns (all of the same length)."""
+        lowered = [np.char.lower(field.astype(str)) for field in fields]
+        size = len(lowered[0]) if lowered else 0
+        haystack = [
+            _FIELD_SEPARATOR.join(row).encode()
+            for row in zip(*(field.tolist() for field in lowered), strict=True)
+        ]
+
+        gram_ids: dict[str, int] = {}
+        value_grams = []
+        for field in lowered:
+            # Compute grams once per distinct value, then fan out to its rows.
+            codes, uniques = pd.factorize(field)
+            pairs = [
+                (code, gram_ids.setdefault(gram, len(gram_ids)))
+                for code, value in enumerate(uniques)
+                for gram in _indexed_grams(value)
+            ]
+            value_grams.append((codes, len(uniques), pairs))
+
+        # Number the grams in sorted order so lookups can binary search them.
+        grams = np.asarray(list(gram_ids), dtype=str)
+        renumber = np.empty(len(grams), dtype=np.int64)
+        renumber[np.argsort(grams)] = np.arange(len(grams))
+        grams = np.sort(grams)
+
+        keys = [np.empty(0, dtype=np.int64)]
+        for codes, values, pairs in value_grams:
+            if not pairs:
+                continue
+            value_codes, gram_codes = np.asarray(pairs, dtype=np.int64).T
+            order = np.argsort(codes, kind="stable")
+            counts = np.bincount(codes, minlength=values)
+            starts = np.cumsum(counts) - counts
+            fan_out = counts[value_codes]
+            offsets = np.arange(fan_out.sum()) - np.repeat(
+                np.cumsum(fan_out) - fan_out, fan_out
+            )
+            rows = order[np.repeat(starts[value_codes], fan_out) + offsets]
+            keys.append(np.repeat(renumber[gram_codes], fan_out) * size + rows)
+
+        keys = np.sort(np.concatenate(keys))
+        # A gram can occur in several fields of one row; keep one posting.
+        keys = keys[np.concatenate(([True], keys[1:] != keys[:-1]))]
+        key_grams, rows = np.divmod(keys, max(size, 1))
+        offsets = np.zeros(len(grams) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(key_grams, minlength=len(grams)), out=offsets[1:])
+        return cls(
+            {
+                "haystack": np.asarray(haystack, dtype=bytes).reshape(size),
+                "grams": grams,
+                "offsets": offsets,
+                "rows": rows.astype(np.int32),
+            }
+        )
+
+    def _posting(self, gram: str) -> np.ndarray:
+        index = np.searchsorted(self._grams, gram)
+        if index < len(self._grams) and self._grams[index] == gram:
+            return self._rows[self._offsets[index] : self._offsets[index + 1]]
+        return np.empty(0, dtype=np.int32)
+
+    def search(self, query: str) -> np.ndarray:
+        """Sorted row indices whose fields contain ``query`` (case-insensitive)."""
+        query = query.lower().replace(_FIELD_SEPARATOR, "")
+        if not query:
+            return np.arange(self.size)
+        if len(query) <= _GRAM:
+            return self._posting(query)
+
+        postings = sorted((self._posting(gram) for gram in _grams(query)), key=len)
+        candidates = postings[0]
+        for posting in postings[1:]:
+            if not len(candidates):
+                break
+            candidates = np.intersect1d(candidates, posting, assume_unique=True)
+        found = np.char.find(self._haystack[candidates], query.encode()) >= 0
+        return candidates[found]
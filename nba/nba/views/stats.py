@@ -219,6 +219,49 @@ def _age_position_chart() -> rx.Component:
     )
 
 
+def _salary_histogram_chart() -> rx.Component:
+    return rx.recharts.bar_chart(
+        rx.recharts.legend(),
+        rx.recharts.graphing_tooltip(),
+        rx.recharts.cartesian_grid(),
+        rx.recharts.bar(data_key="players", stroke="#12A594", fill="#12a594a1"),
+        rx.recharts.x_axis(data_key="salary"),
+        rx.recharts.y_axis(type_="number", scale="auto", hide=True),
+        data=State.get_salary_histogram_data,
+        min_height=325,
+    )
+
+
+def _salary_quartiles_chart(key: str, data: rx.Var) -> rx.Component:
+    return rx.recharts.bar_chart(
+        rx.recharts.legend(),
+        rx.recharts.graphing_tooltip(),
+        rx.recharts.cartesian_grid(),
+        rx.recharts.bar(data_key="first quartile", stroke="#3E63DD", fill="#3e63dd66"),
+        rx.recharts.bar(data_key="median", stroke="#3E63DD", fill="#3e63ddb3"),
+        rx.recharts.bar(data_key="third quartile", stroke="#3E63DD", fill="#3e63dd"),
+        rx.recharts.brush(data_key=key, height=30, stroke="#3E63DD"),
+        rx.recharts.x_axis(data_key=key),
+        rx.recharts.y_axis(type_="number", scale="auto", hide=True),
+        data=data,
+        min_height=325,
+    )
+
+
+def _age_salary_trend_chart() -> rx.Component:
+    return rx.recharts.composed_chart(
+        rx.recharts.legend(),
+        rx.recharts.graphing_tooltip(),
+        rx.recharts.cartesian_grid(),
+        rx.recharts.bar(data_key="average salary", stroke="#30A46C", fill="#5bb98bb3"),
+        rx.recharts.line(data_key="trend", type_="linear", stroke="#E54666", dot=False),
+        rx.recharts.x_axis(data_key="age"),
+        rx.recharts.y_axis(type_="number", scale="auto", hide=True),
+        data=State.get_age_salary_trend_data,
+        min_height=325,
+    )
+
+
 def _radar_toggle() -> rx.Component:
     return rx.cond(
         StatsState.radar_toggle,
@@ -279,6 +322,10 @@ def stats_ui() -> rx.Component:
                         "position_salary",
                         "team_salary",
                         "college_salary",
+                        "salary_histogram",
+                        "team_salary_quartiles",
+                        "position_salary_quartiles",
+                        "age_salary_trend",
                     ],
                     on_change=StatsState.set_stats_view,
                     size="3",
@@ -288,6 +335,13 @@ def stats_ui() -> rx.Component:
                 rx.match(
                     StatsState.stats_view,
                     ("position_salary", "age_position", _radar_toggle()),
+                    (
+                        "salary_histogram",
+                        "team_salary_quartiles",
+                        "position_salary_quartiles",
+                        "age_salary_trend",
+                        rx.fragment(),
+                    ),
                     (_area_toggle()),
                 ),
                 margin_bottom=["2em", "2em", "4em"],
@@ -302,6 +356,20 @@ def stats_ui() -> rx.Component:
                 ("position_salary", _position_salary_chart()),
                 ("team_salary", _team_salary_chart()),
                 ("college_salary", _college_salary_chart()),
+                ("salary_histogram", _salary_histogram_chart()),
+                (
+                    "team_salary_quartiles",
+                    _salary_quartiles_chart(
+                        "team", State.get_team_salary_quartiles_data
+                    ),
+                ),
+                (
+                    "position_salary_quartiles",
+                    _salary_quartiles_chart(
+                        "position", State.get_position_salary_quartiles_data
+                    ),
+                ),
+                ("age_salary_trend", _age_salary_trend_chart()),
             ),
             width="100%",
             justify="center",
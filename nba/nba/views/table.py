@@ -2,6 +2,7 @@ import reflex as rx
 
 from ..backend.backend import Player, State
 from ..backend.data_items import position_dict, teams_dict
+from ..backend.player import MISSING_SALARY
 from ..components.item_badges import item_badge
 
 
@@ -36,7 +37,7 @@ def _show_player(player: Player, index: int) -> rx.Component:
         rx.table.cell(player.height),
         rx.table.cell(player.weight),
         rx.table.cell(player.college),
-        rx.table.cell(player.salary),
+        rx.table.cell(rx.cond(player.salary == MISSING_SALARY, "", player.salary)),
         style={"_hover": {"bg": hover_color}, "bg": bg_color},
         align="center",
     )
@@ -0,0 +1,117 @@
+"""Benchmark loading nbastats.csv into Player records.
+
+Compares the old ``df.iterrows()`` construction with the typed, column-wise
+ingest in ``nba.backend.dataset`` and with loading the dataset from its
+memory-mapped columnar cache. Each measurement runs in a fresh process so peak
+RSS is not shared between runs.
+
+Usage (from the ``nba`` directory):
+
+    python scripts/bench_ingest.py [--sizes 500 50000 1000000]
+"""
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+APP_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(APP_DIR))
+
+from nba.backend.dataset import load_dataset, read_players_columns  # noqa: E402
+from nba.backend.player import Player  # noqa: E402
+
+
+def _load_iterrows(path: str) -> int:
+    df = pd.read_csv(path)
+    df = df.replace("", np.nan)
+    players = [Player(**row) for _, row in df.iterrows()]
+    return len(players)
+
+
+def _load_vectorized(path: str) -> int:
+    columns = read_players_columns(path)
+    players = list(map(Player, *(columns[name].tolist() for name in Player.__slots__)))
+    return len(players)
+
+
+def _load_cached(path: str) -> int:
+    # Measured after a warm-up run, so this is the mmap path, not the build.
+    dataset = load_dataset(path)
+    return len(dataset.players(np.arange(len(dataset))))
+
+
+LOADERS = {
+    "iterrows": _load_iterrows,
+    "vectorized": _load_vectorized,
+    "cached": _load_cached,
+}
+
+
+def _make_csv(rows: int, directory: Path) -> Path:
+    """Tile the bundled stats file until it has ``rows`` rows."""
+    source = pd.read_csv(APP_DIR / "nbastats.csv", dtype=str)
+    repeats = -(-rows // len(source))
+    df = pd.concat([source] * repeats, ignore_index=True).head(rows)
+    path = directory / f"nbastats_{rows}.csv"
+    df.to_csv(path, index=False)
+    return path
+
+
+def _measure(loader: str, path: str) -> dict:
+    """Run one loader in this process and report time and peak RSS."""
+    start = time.perf_counter()
+    rows = LOADERS[loader](path)
+    elapsed = time.perf_counter() - start
+    # ru_maxrss is KiB on Linux and bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_mib = peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    return {"rows": rows, "seconds": elapsed, "peak_rss_mib": peak_mib}
+
+
+def _run(*command: str) -> str:
+    return subprocess.run(command, capture_output=True, check=True, text=True).stdout
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[500, 50_000, 1_000_000]
+    )
+    parser.add_argument("--loaders", nargs="+", default=list(LOADERS))
+    parser.add_argument("--measure", nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        loader, path = args.measure
+        sys.stdout.write(json.dumps(_measure(loader, path)) + "\n")
+        return
+
+    out = sys.stdout
+    out.write(f"{'rows':>10} {'loader':>12} {'seconds':>10} {'peak RSS MiB':>14}\n")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            path = _make_csv(size, Path(tmp))
+            if "cached" in args.loaders:
+                # Build the columnar cache first, in its own process so its peak
+                # RSS is not inherited by the measured runs.
+                _run(sys.executable, __file__, "--measure", "cached", str(path))
+            for loader in args.loaders:
+                stats = json.loads(
+                    _run(sys.executable, __file__, "--measure", loader, str(path))
+                )
+                out.write(
+                    f"{stats['rows']:>10} {loader:>12} "
+                    f"{stats['seconds']:>10.3f} {stats['peak_rss_mib']:>14.1f}\n"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,67 +1,58 @@
-import os
+import asyncio
+import time
+from typing import Any
 
 import openai
 import reflex as rx
-from sqlmodel import asc, desc, func, or_, select
-
-from .models import Customer
-
-products: dict[str, dict] = {
-    "T-shirt": {
-        "description": "A plain white t-shirt made of 100% cotton.",
-        "price": 10.99,
-    },
-    "Jeans": {
-        "description": "A pair of blue denim jeans with a straight leg fit.",
-        "price": 24.99,
-    },
-    "Hoodie": {
-        "description": "A black hoodie made of a cotton and polyester blend.",
-        "price": 34.99,
-    },
-    "Cardigan": {
-        "description": "A grey cardigan with a V-neck and long sleeves.",
-        "price": 36.99,
-    },
-    "Joggers": {
-        "description": "A pair of black joggers made of a cotton and polyester blend.",
-        "price": 44.99,
-    },
-    "Dress": {"description": "A black dress made of 100% polyester.", "price": 49.99},
-    "Jacket": {
-        "description": "A navy blue jacket made of 100% cotton.",
-        "price": 55.99,
-    },
-    "Skirt": {
-        "description": "A brown skirt made of a cotton and polyester blend.",
-        "price": 29.99,
-    },
-    "Shorts": {
-        "description": "A pair of black shorts made of a cotton and polyester blend.",
-        "price": 19.99,
-    },
-    "Sweater": {
-        "description": "A white sweater with a crew neck and long sleeves.",
-        "price": 39.99,
-    },
-}
-
-_client = None
-
-
-def get_openai_client():
-    global _client
-    if _client is None:
-        _client = openai.OpenAI(api_key=os.environ["OPENAI_API_KEY"])
-
-    return _client
+from sqlalchemy import tuple_
+from sqlmodel import func, or_, select
+
+from .bulk import Progress, generate_batch
+from .cache import lookup, prompt_key, store
+from .llm import coalesce, stream_completion
+from .models import NUMERIC_FIELDS, SORT_FIELDS, TEXT_FIELDS, Customer, sort_key
+from .prompts import email_messages
+
+# Seconds between progress updates of a bulk run.
+_PROGRESS_INTERVAL = 0.5
+
+
+def _form_values(form_data: dict) -> dict:
+    """Customer column values from a customer form, which submits text.
+
+    Raises ValueError, with a message for the user, if a numeric field is not
+    a whole number.
+    """
+    values = {
+        field: value
+        for field, value in form_data.items()
+        if field in Customer.model_fields and field != "id"
+    }
+    for field in NUMERIC_FIELDS:
+        if field in values:
+            text = str(values[field]).strip()
+            if not text.isdecimal() or int(text) >= 2**31:
+                raise ValueError(f"{field.capitalize()} must be a whole number")
+            values[field] = int(text)
+    return values
+
+
+def _read_customers(query) -> list[Customer]:
+    with rx.session() as session:
+        return list(session.exec(query).all())
 
 
 class State(rx.State):
     """The app state."""
 
     current_user: Customer = Customer()
+    # Customers shown in the table; _page_keys holds the ORDER BY values of
+    # each, which next_page and prev_page continue from.
     users: list[Customer] = []
+    _page_keys: list[list[Any]] = []
+    total_items: int = 0
+    page_number: int = 1
+    page_size: int = 10
     products: dict[str, str] = {}
     email_content_data: str = (
         "Click 'Generate Email' to generate a personalized sales email."
@@ -72,6 +63,10 @@ class State(rx.State):
     search_value: str = ""
     sort_value: str = ""
     sort_reverse: bool = False
+    bulk_running: bool = False
+    bulk_total: int = 0
+    bulk_done: int = 0
+    bulk_failed: int = 0
 
     @rx.event
     def set_tone(self, value: str):
@@ -81,42 +76,152 @@ class State(rx.State):
     def set_length(self, value: list[int | float]):
         self.length = int(value[0])
 
-    def load_entries(self) -> list[Customer]:
-        """Get all users from the database."""
-        with rx.session() as session:
-            query = select(Customer)
-            if self.search_value:
-                search_value = f"%{str(self.search_value).lower()}%"
+    def _search_filter(self):
+        """What a customer must match to be found by the search, or None.
+
+        Text columns match if they contain the search, case-insensitively;
+        numeric columns only if they equal it.
+        """
+        value = self.search_value.strip().lower()
+        if not value:
+            return None
+        conditions = [
+            func.lower(getattr(Customer, field)).contains(value, autoescape=True)
+            for field in TEXT_FIELDS
+        ]
+        if value.isdecimal() and int(value) < 2**31:
+            conditions += [
+                getattr(Customer, field) == int(value) for field in NUMERIC_FIELDS
+            ]
+        return or_(*conditions)
+
+    def _search(self, query):
+        """Restrict ``query`` to the customers matching the search."""
+        condition = self._search_filter()
+        return query if condition is None else query.where(condition)
+
+    def _sort_keys(self) -> list:
+        """The (sort key, id) rows are ordered by."""
+        if self.sort_value in SORT_FIELDS:
+            return [sort_key(self.sort_value), Customer.id]
+        return [Customer.id]
+
+    def _descending(self) -> bool:
+        return self.sort_value in SORT_FIELDS and self.sort_reverse
+
+    def _customer_query(self):
+        """All the customers matching the search, in the table's order."""
+        keys = self._sort_keys()
+        if self._descending():
+            keys = [key.desc() for key in keys]
+        return self._search(select(Customer)).order_by(*keys)
+
+    def _fetch(
+        self,
+        cursor: list[Any] | None = None,
+        forward: bool = True,
+        limit: int = 0,
+        offset: int = 0,
+    ) -> tuple[list[Customer], list[list[Any]]]:
+        """Up to a page of customers following ``cursor``, with their keys.
+
+        ``cursor`` is the ORDER BY values of a customer already shown; with
+        ``forward=False`` the customers preceding it are read instead (for
+        the previous and last pages). Stepping through the table this way
+        needs no OFFSET, which SQLite can only serve by counting through every
+        earlier customer; ``offset`` is for jumping to a page by its number.
+        """
+        keys = self._sort_keys()
+        descending = not forward
+        if self.sort_value in SORT_FIELDS:
+            descending = self.sort_reverse != descending
+        query = self._search(select(Customer, *keys))
+        if cursor is not None:
+            position, after = tuple_(*keys), tuple_(*cursor)
+            # The bound on the sort key alone is implied by the row comparison,
+            # but SQLite only seeks an expression index (lower(...)) with it.
+            if descending:
+                query = query.where(
+                    keys[0] <= cursor[0],
+                    position < after,
+                )
+            else:
                 query = query.where(
-                    or_(
-                        *[
-                            getattr(Customer, field).ilike(search_value)
-                            for field in Customer.get_fields()
-                        ],
-                    )
+                    keys[0] >= cursor[0],
+                    position > after,
                 )
+        query = query.order_by(*(key.desc() if descending else key for key in keys))
+        with rx.session() as session:
+            rows = session.exec(
+                query.offset(offset).limit(limit or self.page_size)
+            ).all()
+        if not forward:
+            rows.reverse()
+        return [row[0] for row in rows], [list(row[1:]) for row in rows]
+
+    def _load_page(
+        self,
+        cursor: list[Any] | None = None,
+        forward: bool = True,
+        limit: int = 0,
+        offset: int = 0,
+    ):
+        """Show what ``_fetch`` reads as the current page."""
+        self.users, self._page_keys = self._fetch(cursor, forward, limit, offset)
+
+    def _reload_page(self):
+        """Re-count the matching customers and re-read page ``page_number``.
+
+        After adding, changing or deleting a customer the page is read by its
+        number: a customer added or removed ahead of it moves every row on it
+        by one, so seeking from its old first row would show the wrong rows.
+        """
+        self._count_users()
+        if self.page_number > self.total_pages:
+            self.last_page()
+        else:
+            self._load_page(offset=(self.page_number - 1) * self.page_size)
+
+    def _count_users(self):
+        query = self._search(select(func.count()).select_from(Customer))
+        with rx.session() as session:
+            self.total_items = session.exec(query).one()
+
+    def load_entries(self):
+        """Count the matching users and load the first page."""
+        self._count_users()
+        self.first_page()
+
+    @rx.var(cache=True)
+    def total_pages(self) -> int:
+        return max(-(-self.total_items // self.page_size), 1)
 
-            if self.sort_value:
-                sort_column = getattr(Customer, self.sort_value)
-                if self.sort_value == "salary":
-                    order = desc(sort_column) if self.sort_reverse else asc(sort_column)
-                else:
-                    order = (
-                        desc(func.lower(sort_column))
-                        if self.sort_reverse
-                        else asc(func.lower(sort_column))
-                    )
-                query = query.order_by(order)
+    def first_page(self):
+        self.page_number = 1
+        self._load_page()
 
-            self.users = session.exec(query).all()
+    def next_page(self):
+        if self.page_number < self.total_pages:
+            self.page_number += 1
+            self._load_page(self._page_keys[-1] if self._page_keys else None)
+
+    def prev_page(self):
+        if self.page_number > 1:
+            self.page_number -= 1
+            self._load_page(self._page_keys[0] if self._page_keys else None, False)
+
+    def last_page(self):
+        self.page_number = self.total_pages
+        last_page_size = self.total_items % self.page_size or self.page_size
+        self._load_page(forward=False, limit=last_page_size)
 
     def sort_values(self, sort_value: str):
         self.sort_value = sort_value
-        self.load_entries()
+        self.first_page()
 
     def toggle_sort(self):
         self.sort_reverse = not self.sort_reverse
-        self.load_entries()
+        self.first_page()
 
     def filter_values(self, search_value):
         self.search_value = search_value
@@ -126,7 +231,11 @@ class State(rx.State):
         self.current_user = user
 
     def add_customer_to_db(self, form_data: dict):
-        self.current_user = Customer(**form_data)
+        try:
+            values = _form_values(form_data)
+        except ValueError as error:
+            return rx.window_alert(str(error))
+        self.current_user = Customer(**values)
 
         with rx.session() as session:
             if session.exec(
@@ -136,22 +245,27 @@ class State(rx.State):
             session.add(self.current_user)
             session.commit()
             session.refresh(self.current_user)
-        self.load_entries()
+        self._reload_page()
         return rx.toast.info(
             f"User {self.current_user.customer_name} has been added.",
             position="bottom-right",
         )
 
     def update_customer_to_db(self, form_data: dict):
+        try:
+            values = _form_values(form_data)
+        except ValueError as error:
+            return rx.window_alert(str(error))
         with rx.session() as session:
             customer = session.exec(
                 select(Customer).where(Customer.id == self.current_user.id)
             ).first()
-            customer.set(**form_data)
+            customer.sqlmodel_update(values)
+            session.add(customer)
             session.commit()
             session.refresh(customer)
             self.current_user = customer
-        self.load_entries()
+        self._reload_page()
         return rx.toast.info(
             f"User {self.current_user.customer_name} has been modified.",
             position="bottom-right",
@@ -163,41 +277,103 @@ class State(rx.State):
             customer = session.exec(select(Customer).where(Customer.id == id)).first()
             session.delete(customer)
             session.commit()
-        self.load_entries()
+        self._reload_page()
         return rx.toast.info(
             f"User {customer.customer_name} has been deleted.", position="bottom-right"
         )
 
     @rx.event(background=True)
-    async def call_openai(self):
-        session = get_openai_client().chat.completions.create(
-            user=self.router.session.client_token,
-            stream=True,
-            model="gpt-3.5-turbo",
-            messages=[
-                {
-                    "role": "system",
-                    "content": f"You are a salesperson at Reflex, a company that sells clothing. You have a list of products and customer data. Your task is to write a sales email to a customer recommending one of the products. The email should be personalized and include a recommendation based on the customer's data. The email should be {self.tone} and {self.length} characters long.",
-                },
-                {
-                    "role": "user",
-                    "content": f"Based on these {products} write a sales email to {self.current_user.customer_name} and email {self.current_user.email} who is {self.current_user.age} years old and a {self.current_user.gender} gender. {self.current_user.customer_name} lives in {self.current_user.location} and works as a {self.current_user.job} and earns {self.current_user.salary} per year. Make sure the email recommends one product only and is personalized to {self.current_user.customer_name}. The company is named Reflex its website is https://reflex.dev.",
-                },
-            ],
-        )
-        for item in session:
-            if hasattr(item.choices[0].delta, "content"):
-                response_text = item.choices[0].delta.content
+    async def call_openai(self, force: bool = False):
+        messages = email_messages(self.current_user, self.tone, self.length)
+        key = prompt_key(messages)
+        if not force and (cached := await lookup(key)) is not None:
+            async with self:
+                self.email_content_data = cached
+                self.gen_response = False
+            return
+        stream = stream_completion(messages, user=self.router.session.client_token)
+        content = []
+        try:
+            # One state update (and websocket message) per piece rather than
+            # per token: at most 20 a second, which still reads as live.
+            async for response_text in coalesce(stream, interval=0.05, size=64):
+                content.append(response_text)
                 async with self:
-                    if response_text is not None:
-                        self.email_content_data += response_text
-                yield
-
-        async with self:
-            self.gen_response = False
+                    self.email_content_data += response_text
+            await store(key, "".join(content))
+        except openai.OpenAIError as error:
+            yield rx.toast.error(
+                f"Could not generate the email: {error}", position="bottom-right"
+            )
+        finally:
+            async with self:
+                self.gen_response = False
 
     def generate_email(self, user: Customer):
         self.current_user = user
         self.gen_response = True
         self.email_content_data = ""
         return State.call_openai
+
+    def regenerate_email(self):
+        """Generate the current customer's email again, bypassing the cache."""
+        if self.current_user.id is None:
+            return
+        self.gen_response = True
+        self.email_content_data = ""
+        return State.call_openai(True)
+
+    @rx.event(background=True)
+    async def generate_bulk(self):
+        """Generate an email to every customer matching the search, in the background."""
+        async with self:
+            if self.bulk_running:
+                return
+            self.bulk_running = True
+            self.bulk_total = self.bulk_done = self.bulk_failed = 0
+            query = self._customer_query()
+            tone, length = self.tone, self.length
+
+        last_report = time.monotonic()
+
+        async def report(progress: Progress) -> bool:
+            nonlocal last_report
+            finished = progress.done + progress.failed == progress.total
+            if not finished and time.monotonic() - last_report < _PROGRESS_INTERVAL:
+                return True
+            last_report = time.monotonic()
+            async with self:
+                self.bulk_done = progress.done
+                self.bulk_failed = progress.failed
+                # False once stop_bulk has been called.
+                return self.bulk_running
+
+        try:
+            customers = await asyncio.to_thread(_read_customers, query)
+            async with self:
+                self.bulk_total = len(customers)
+            progress = await generate_batch(
+                customers, tone, length, report, user=self.router.session.client_token
+            )
+        except Exception as error:
+            # Not a failed email (those are counted and saved) but the run
+            # itself, e.g. no API key configured or the database unavailable.
+            yield rx.toast.error(
+                f"Bulk generation stopped: {error!r}", position="bottom-right"
+            )
+            return
+        finally:
+            async with self:
+                self.bulk_running = False
+        async with self:
+            self.bulk_done = progress.done
+            self.bulk_failed = progress.failed
+        yield rx.toast.info(
+            f"Generated {progress.done} of {progress.total} emails"
+            + (f", {progress.failed} failed." if progress.failed else "."),
+            position="bottom-right",
+        )
+
+    @rx.event
+    def stop_bulk(self):
+        self.bulk_running = False
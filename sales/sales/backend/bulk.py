@@ -0,0 +1,137 @@
+"""Generate sales emails for many customers at once.
+
+A run works through its customers with a fixed number of requests in flight,
+retries the ones that fail on rate limits, timeouts or server errors with
+exponential backoff, and saves each email (or the error that stopped it) to
+the ``generatedemail`` table as it goes.
+"""
+
+import asyncio
+import random
+import uuid
+from contextlib import suppress
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+import openai
+import reflex as rx
+
+from .llm import complete
+from .models import Customer, GeneratedEmail
+from .prompts import email_messages
+
+# Requests in flight per run.
+CONCURRENCY = 8
+# Seconds one attempt at an email may take, from request to full response.
+REQUEST_TIMEOUT = 60.0
+MAX_ATTEMPTS = 4
+# Seconds before the first retry, doubled for each one after.
+BACKOFF = 1.0
+
+# Emails saved per transaction.
+_SAVE_BATCH = 50
+
+_RETRYABLE = (
+    openai.APIConnectionError,
+    openai.RateLimitError,
+    openai.InternalServerError,
+    asyncio.TimeoutError,
+)
+
+
+@dataclass
+class Progress:
+    """How far a run is through its customers."""
+
+    total: int
+    done: int = 0
+    failed: int = 0
+
+
+def _backoff(attempt: int, error: Exception) -> float:
+    # Jittered, so workers throttled together do not all retry together.
+    delay = BACKOFF * 2**attempt * random.uniform(0.5, 1)
+    if isinstance(error, openai.RateLimitError):
+        with suppress(ValueError):
+            delay = max(delay, float(error.response.headers.get("retry-after", "")))
+    return delay
+
+
+async def generate_email(messages: list[dict], user: str = "") -> str:
+    """One email, retried with backoff if a transient error stops it."""
+    attempt = 0
+    while True:
+        try:
+            return await asyncio.wait_for(complete(messages, user), REQUEST_TIMEOUT)
+        except _RETRYABLE as error:
+            if attempt == MAX_ATTEMPTS - 1:
+                raise
+            await asyncio.sleep(_backoff(attempt, error))
+            attempt += 1
+
+
+def _save(emails: list[GeneratedEmail]):
+    with rx.session() as session:
+        session.add_all(emails)
+        session.commit()
+
+
+class _Stopped(Exception):
+    pass
+
+
+async def generate_batch(
+    customers: list[Customer],
+    tone: str,
+    length: int,
+    report: Callable[[Progress], Awaitable[bool]],
+    concurrency: int = CONCURRENCY,
+    user: str = "",
+) -> Progress:
+    """Generate and save an email to each of ``customers``.
+
+    ``report`` is awaited after every email; the run stops early, leaving the
+    remaining customers without an email, as soon as it returns False.
+    """
+    batch = uuid.uuid4().hex
+    progress = Progress(total=len(customers))
+    # Shared by the workers: each takes the next customer when it is free.
+    pending = iter(customers)
+    unsaved: list[GeneratedEmail] = []
+
+    async def save():
+        emails = unsaved[:]
+        unsaved.clear()
+        if emails:
+            await asyncio.to_thread(_save, emails)
+
+    async def worker():
+        for customer in pending:
+            email = GeneratedEmail(
+                customer_id=customer.id, batch=batch, tone=tone, length=length
+            )
+            try:
+                email.content = await generate_email(
+                    email_messages(customer, tone, length), user
+                )
+                progress.done += 1
+            except (openai.OpenAIError, asyncio.TimeoutError) as error:
+                email.error = str(error) or type(error).__name__
+                progress.failed += 1
+            unsaved.append(email)
+            if len(unsaved) >= _SAVE_BATCH:
+                await save()
+            if not await report(progress):
+                raise _Stopped
+
+    workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+    try:
+        await asyncio.gather(*workers)
+    except _Stopped:
+        pass
+    finally:
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        await save()
+    return progress
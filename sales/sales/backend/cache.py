@@ -0,0 +1,89 @@
+"""Cache of generated emails, keyed by the prompt they were generated from.
+
+The key is a hash of the model and the whole prompt (catalogue, customer
+details, tone and length), so changing any of them makes a new entry and
+nothing ever needs invalidating. Entries expire after ``CACHE_TTL``. The most
+recently used ones are also kept in the worker's memory; all of them are
+stored in the ``cachedemail`` table, shared by every worker.
+"""
+
+import asyncio
+import hashlib
+import json
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+import reflex as rx
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import select
+
+from .llm import MODEL
+from .models import CachedEmail
+
+CACHE_TTL = timedelta(days=7)
+# Entries kept in memory, per worker.
+MEMORY_SIZE = 1024
+
+# Least recently used first.
+_memory: OrderedDict[str, tuple[str, datetime]] = OrderedDict()
+
+
+def prompt_key(messages: list[dict], model: str = MODEL) -> str:
+    """The cache key of the completion of ``messages``."""
+    prompt = json.dumps({"model": model, "messages": messages}, sort_keys=True)
+    return hashlib.sha256(prompt.encode()).hexdigest()
+
+
+def _remember(key: str, content: str, created: datetime):
+    _memory[key] = (content, created)
+    _memory.move_to_end(key)
+    while len(_memory) > MEMORY_SIZE:
+        _memory.popitem(last=False)
+
+
+def _load(key: str) -> CachedEmail | None:
+    with rx.session() as session:
+        return session.exec(
+            select(CachedEmail).where(
+                CachedEmail.key == key,
+                CachedEmail.created > datetime.now() - CACHE_TTL,
+            )
+        ).first()
+
+
+def _save(key: str, content: str, created: datetime):
+    with rx.session() as session:
+        entry = session.exec(select(CachedEmail).where(CachedEmail.key == key)).first()
+        if entry is None:
+            entry = CachedEmail(key=key)
+        entry.content = content
+        entry.created = created
+        session.add(entry)
+        try:
+            session.commit()
+        except IntegrityError:
+            # Another worker stored the same key first.
+            session.rollback()
+
+
+async def lookup(key: str) -> str | None:
+    """The cached email for ``key``, unless there is none or it has expired."""
+    entry = _memory.get(key)
+    if entry is not None and datetime.now() - entry[1] > CACHE_TTL:
+        # Another worker may have stored a newer one.
+        del _memory[key]
+        entry = None
+    if entry is None:
+        row = await asyncio.to_thread(_load, key)
+        if row is None:
+            return None
+        entry = (row.content, row.created)
+    _remember(key, *entry)
+    return entry[0]
+
+
+async def store(key: str, content: str):
+    """Cache ``content`` as the email for ``key``, replacing any previous one."""
+    created = datetime.now()
+    _remember(key, content, created)
+    await asyncio.to_thread(_save, key, content, created)
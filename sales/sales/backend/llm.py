@@ -0,0 +1,105 @@
+"""Async OpenAI client shared by every session of a worker.
+
+Responses are streamed over one pooled httpx client, so generating an email
+only ever awaits the network and never blocks the event loop other sessions
+run on. Set ``OPENAI_BASE_URL`` to point it at another OpenAI-compatible API,
+e.g. ``scripts/mock_openai.py`` for local testing.
+"""
+
+import asyncio
+import os
+from typing import AsyncIterable, AsyncIterator
+
+import httpx
+import openai
+
+MODEL = "gpt-3.5-turbo"
+
+# A response may take a while to start, but then tokens arrive steadily: the
+# read timeout applies between chunks, not to the whole stream.
+_TIMEOUT = httpx.Timeout(30.0, connect=5.0)
+_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20)
+
+_client: openai.AsyncOpenAI | None = None
+
+
+def get_openai_client() -> openai.AsyncOpenAI:
+    global _client
+    if _client is None:
+        _client = openai.AsyncOpenAI(
+            api_key=os.environ["OPENAI_API_KEY"],
+            base_url=os.environ.get("OPENAI_BASE_URL"),
+            timeout=_TIMEOUT,
+            max_retries=2,
+            http_client=httpx.AsyncClient(timeout=_TIMEOUT, limits=_LIMITS),
+        )
+    return _client
+
+
+async def stream_completion(
+    messages: list[dict], user: str = "", model: str = MODEL
+) -> AsyncIterator[str]:
+    """Yield the text of a chat completion as it is generated."""
+    stream = await get_openai_client().chat.completions.create(
+        model=model, messages=messages, user=user, stream=True
+    )
+    async with stream:
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+
+async def coalesce(
+    chunks: AsyncIterable[str], interval: float = 0.05, size: int = 64
+) -> AsyncIterator[str]:
+    """Regroup streamed text into fewer, larger pieces.
+
+    A piece is yielded once it holds ``size`` characters, or ``interval``
+    seconds after its first character arrived, whichever comes first, so no
+    text waits longer than ``interval`` to be shown even if the stream stalls.
+    The next chunk is read while the caller handles a piece.
+    """
+    loop = asyncio.get_running_loop()
+    chunks = aiter(chunks)
+    next_chunk = asyncio.ensure_future(anext(chunks))
+    buffer: list[str] = []
+    length = 0
+    deadline = 0.0
+    try:
+        while True:
+            timeout = max(deadline - loop.time(), 0) if buffer else None
+            done, _ = await asyncio.wait((next_chunk,), timeout=timeout)
+            if done:
+                try:
+                    chunk = next_chunk.result()
+                except StopAsyncIteration:
+                    break
+                next_chunk = asyncio.ensure_future(anext(chunks))
+                if not buffer:
+                    deadline = loop.time() + interval
+                buffer.append(chunk)
+                length += len(chunk)
+                if length < size and loop.time() < deadline:
+                    continue
+            yield "".join(buffer)
+            buffer = []
+            length = 0
+        if buffer:
+            yield "".join(buffer)
+    finally:
+        # Stops the stream if the caller does not read it to the end.
+        next_chunk.cancel()
+        await asyncio.gather(next_chunk, return_exceptions=True)
+
+
+async def complete(messages: list[dict], user: str = "", model: str = MODEL) -> str:
+    """The text of a chat completion, in one response.
+
+    Not retried: callers doing many requests handle that with their own backoff.
+    """
+    response = (
+        await get_openai_client()
+        .with_options(max_retries=0)
+        .chat.completions.create(model=model, messages=messages, user=user)
+    )
+    return response.choices[0].message.content or ""
@@ -1,4 +1,8 @@
+from datetime import datetime
+
 import reflex as rx
+from sqlalchemy import Index
+from sqlmodel import DateTime, Field, func
 
 
 class Customer(rx.Model, table=True):  # type: ignore
@@ -11,3 +15,44 @@ class Customer(rx.Model, table=True):  # type: ignore
     location: str
     job: str
     salary: int
+
+
+# Columns the table can be sorted by. Numeric columns sort by value, text
+# columns case-insensitively.
+SORT_FIELDS = ("customer_name", "email", "age", "gender", "location", "job", "salary")
+NUMERIC_FIELDS = ("age", "salary")
+TEXT_FIELDS = tuple(field for field in SORT_FIELDS if field not in NUMERIC_FIELDS)
+
+
+def sort_key(field: str, entity=Customer):
+    """What ``field`` sorts by: age and salary by value, text lowercased."""
+    column = getattr(entity, field)
+    return column if field in NUMERIC_FIELDS else func.lower(column)
+
+
+# Customer table pages are read in (sort key, id) order starting from a row's
+# keys, so each sortable column gets a matching index, lower() and all for text.
+for _field in SORT_FIELDS:
+    Index(f"ix_customer_sort_{_field}", sort_key(_field), Customer.id)
+
+
+class GeneratedEmail(rx.Model, table=True):  # type: ignore
+    """An email generated for a customer by a bulk run."""
+
+    customer_id: int = Field(foreign_key="customer.id", ondelete="CASCADE", index=True)
+    # The run that generated it.
+    batch: str = Field(index=True)
+    tone: str
+    length: int
+    content: str = ""
+    # Why no email could be generated, if so.
+    error: str = ""
+    created: datetime = Field(default_factory=datetime.now, sa_type=DateTime)
+
+
+class CachedEmail(rx.Model, table=True):  # type: ignore
+    """A generated email, stored under the hash of its prompt (see cache.py)."""
+
+    key: str = Field(unique=True, index=True)
+    content: str
+    created: datetime = Field(default_factory=datetime.now, sa_type=DateTime)
@@ -0,0 +1,57 @@
+"""The catalogue and prompt sales emails are generated from."""
+
+from .models import Customer
+
+products: dict[str, dict] = {
+    "T-shirt": {
+        "description": "A plain white t-shirt made of 100% cotton.",
+        "price": 10.99,
+    },
+    "Jeans": {
+        "description": "A pair of blue denim jeans with a straight leg fit.",
+        "price": 24.99,
+    },
+    "Hoodie": {
+        "description": "A black hoodie made of a cotton and polyester blend.",
+        "price": 34.99,
+    },
+    "Cardigan": {
+        "description": "A grey cardigan with a V-neck and long sleeves.",
+        "price": 36.99,
+    },
+    "Joggers": {
+        "description": "A pair of black joggers made of a cotton and polyester blend.",
+        "price": 44.99,
+    },
+    "Dress": {"description": "A black dress made of 100% polyester.", "price": 49.99},
+    "Jacket": {
+        "description": "A navy blue jacket made of 100% cotton.",
+        "price": 55.99,
+    },
+    "Skirt": {
+        "description": "A brown skirt made of a cotton and polyester blend.",
+        "price": 29.99,
+    },
+    "Shorts": {
+        "description": "A pair of black shorts made of a cotton and polyester blend.",
+        "price": 19.99,
+    },
+    "Sweater": {
+        "description": "A white sweater with a crew neck and long sleeves.",
+        "price": 39.99,
+    },
+}
+
+
+def email_messages(customer: Customer, tone: str, length: int) -> list[dict]:
+    """The chat messages asking for a sales email to ``customer``."""
+    return [
+        {
+            "role": "system",
+            "content": f"You are a salesperson at Reflex, a company that sells clothing. You have a list of products and customer data. Your task is to write a sales email to a customer recommending one of the products. The email should be personalized and include a recommendation based on the customer's data. The email should be {tone} and {length} characters long.",
+        },
+        {
+            "role": "user",
+            "content": f"Based on these {products} write a sales email to {customer.customer_name} and email {customer.email} who is {customer.age} years old and a {customer.gender} gender. {customer.customer_name} lives in {customer.location} and works as a {customer.job} and earns {customer.salary} per year. Make sure the email recommends one product only and is personalized to {customer.customer_name}. The company is named Reflex its website is https://reflex.dev.",
+        },
+    ]
@@ -6,16 +6,28 @@ from ..backend.backend import State
 def email_box():
     return rx.box(
         rx.scroll_area(
-            rx.icon_button(
-                rx.icon("copy"),
-                variant="soft",
-                color_scheme="gray",
-                size="2",
-                on_click=[
-                    rx.set_clipboard(State.email_content_data),
-                    rx.toast.info("Copied to clipboard"),
-                ],
-                cursor="pointer",
+            rx.hstack(
+                rx.icon_button(
+                    rx.icon("refresh-cw"),
+                    variant="soft",
+                    color_scheme="gray",
+                    size="2",
+                    on_click=State.regenerate_email,
+                    disabled=State.gen_response,
+                    cursor="pointer",
+                ),
+                rx.icon_button(
+                    rx.icon("copy"),
+                    variant="soft",
+                    color_scheme="gray",
+                    size="2",
+                    on_click=[
+                        rx.set_clipboard(State.email_content_data),
+                        rx.toast.info("Copied to clipboard"),
+                    ],
+                    cursor="pointer",
+                ),
+                spacing="2",
                 position="absolute",
                 bottom="1px",
                 right="1px",
@@ -64,11 +76,53 @@ def options():
             ),
             width="100%",
         ),
+        bulk_options(),
         spacing="5",
         width="100%",
     )
 
 
+def bulk_options():
+    return rx.vstack(
+        rx.heading("Email all listed customers", size="5"),
+        rx.cond(
+            State.bulk_running,
+            rx.hstack(
+                rx.progress(
+                    value=State.bulk_done + State.bulk_failed,
+                    max=State.bulk_total,
+                    width="100%",
+                ),
+                rx.button(
+                    "Stop",
+                    variant="soft",
+                    color_scheme="red",
+                    on_click=State.stop_bulk,
+                ),
+                align="center",
+                width="100%",
+            ),
+            rx.button(
+                rx.icon("mails", size=22),
+                rx.text("Generate Emails", size="3"),
+                color_scheme="blue",
+                on_click=State.generate_bulk,
+                width="100%",
+            ),
+        ),
+        rx.cond(
+            State.bulk_total > 0,
+            rx.text(
+                f"{State.bulk_done} of {State.bulk_total} generated, "
+                f"{State.bulk_failed} failed",
+                size="2",
+                color_scheme="gray",
+            ),
+        ),
+        width="100%",
+    )
+
+
 def email_gen_ui():
     return (
         rx.card(
@@ -382,6 +382,59 @@ def _update_customer_dialog(user):
     )
 
 
+def _pagination_view() -> rx.Component:
+    return rx.hstack(
+        rx.text(
+            "Page ",
+            rx.code(State.page_number),
+            f" of {State.total_pages}",
+            justify="end",
+        ),
+        rx.hstack(
+            rx.icon_button(
+                rx.icon("chevrons-left", size=18),
+                on_click=State.first_page,
+                opacity=rx.cond(State.page_number == 1, 0.6, 1),
+                color_scheme=rx.cond(State.page_number == 1, "gray", "accent"),
+                variant="soft",
+            ),
+            rx.icon_button(
+                rx.icon("chevron-left", size=18),
+                on_click=State.prev_page,
+                opacity=rx.cond(State.page_number == 1, 0.6, 1),
+                color_scheme=rx.cond(State.page_number == 1, "gray", "accent"),
+                variant="soft",
+            ),
+            rx.icon_button(
+                rx.icon("chevron-right", size=18),
+                on_click=State.next_page,
+                opacity=rx.cond(State.page_number == State.total_pages, 0.6, 1),
+                color_scheme=rx.cond(
+                    State.page_number == State.total_pages, "gray", "accent"
+                ),
+                variant="soft",
+            ),
+            rx.icon_button(
+                rx.icon("chevrons-right", size=18),
+                on_click=State.last_page,
+                opacity=rx.cond(State.page_number == State.total_pages, 0.6, 1),
+                color_scheme=rx.cond(
+                    State.page_number == State.total_pages, "gray", "accent"
+                ),
+                variant="soft",
+            ),
+            align="center",
+            spacing="2",
+            justify="end",
+        ),
+        spacing="5",
+        margin_top="1em",
+        align="center",
+        width="100%",
+        justify="end",
+    )
+
+
 def main_table():
     return rx.fragment(
         rx.flex(
@@ -452,4 +505,5 @@ def main_table():
             size="3",
             width="100%",
         ),
+        _pagination_view(),
     )
@@ -0,0 +1,154 @@
+"""Load test concurrent email generations against the mock OpenAI API.
+
+Starts ``scripts/mock_openai.py`` in a subprocess, then runs the same number
+of concurrent generations on one event loop two ways: iterating a sync
+``openai.OpenAI`` stream (as ``call_openai`` used to), and with the app's
+async client. For each it reports the wall time, the slowest time to first
+token and the longest the event loop went without running other tasks.
+
+Usage (from the ``sales`` directory):
+
+    python scripts/load_test.py [--concurrency 1 10 50] [--latency 0.5] [--token-delay 0.02] [--tokens 100]
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import openai
+
+APP_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(APP_DIR))
+
+from sales.backend.llm import MODEL, stream_completion  # noqa: E402
+
+_MESSAGES = [{"role": "user", "content": "Write a sales email."}]
+
+
+@contextmanager
+def _mock_server(latency: float, token_delay: float, tokens: int):
+    """Run the mock API on a free port for a block; yield its base URL."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = subprocess.Popen(
+        (
+            sys.executable,
+            str(APP_DIR / "scripts" / "mock_openai.py"),
+            "--port",
+            str(port),
+            "--latency",
+            str(latency),
+            "--token-delay",
+            str(token_delay),
+            "--tokens",
+            str(tokens),
+        ),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        while True:
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=1).close()
+                break
+            except OSError:
+                if server.poll() is not None:
+                    raise RuntimeError(
+                        "The mock OpenAI server failed to start"
+                    ) from None
+                time.sleep(0.05)
+        yield f"http://127.0.0.1:{port}/v1"
+    finally:
+        server.terminate()
+        server.wait()
+
+
+async def _blocking_generation(client: openai.OpenAI, started: float) -> float:
+    """One generation iterating a sync stream; return its time to first token."""
+    first = None
+    stream = client.chat.completions.create(
+        model=MODEL, messages=_MESSAGES, stream=True
+    )
+    for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            first = first or time.perf_counter() - started
+        await asyncio.sleep(0)
+    return first
+
+
+async def _async_generation(started: float) -> float:
+    """One generation with the app's async client; return its time to first token."""
+    first = None
+    async for _ in stream_completion(_MESSAGES):
+        first = first or time.perf_counter() - started
+    return first
+
+
+async def _measure(concurrency: int, blocking: bool) -> dict:
+    """Run ``concurrency`` generations at once, watching the event loop's lag."""
+    max_lag = 0.0
+    done = False
+
+    async def watch(interval: float = 0.005):
+        nonlocal max_lag
+        while not done:
+            before = time.perf_counter()
+            await asyncio.sleep(interval)
+            max_lag = max(max_lag, time.perf_counter() - before - interval)
+
+    watcher = asyncio.create_task(watch())
+    await asyncio.sleep(0.01)
+    client = openai.OpenAI() if blocking else None
+    started = time.perf_counter()
+    firsts = await asyncio.gather(
+        *(
+            _blocking_generation(client, started)
+            if blocking
+            else _async_generation(started)
+            for _ in range(concurrency)
+        )
+    )
+    wall = time.perf_counter() - started
+    done = True
+    await watcher
+    return {"wall": wall, "first_token": max(firsts), "max_lag": max_lag}
+
+
+async def _run(concurrencies: list[int]):
+    out = sys.stdout
+    out.write(
+        f"{'client':>8} {'concurrent':>10} {'wall s':>8} "
+        f"{'first token s':>14} {'max loop lag ms':>16}\n"
+    )
+    for concurrency in concurrencies:
+        for name, blocking in (("sync", True), ("async", False)):
+            stats = await _measure(concurrency, blocking)
+            out.write(
+                f"{name:>8} {concurrency:>10} {stats['wall']:>8.2f} "
+                f"{stats['first_token']:>14.2f} {stats['max_lag'] * 1000:>16.1f}\n"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--token-delay", type=float, default=0.02)
+    parser.add_argument("--tokens", type=int, default=100)
+    args = parser.parse_args()
+
+    with _mock_server(args.latency, args.token_delay, args.tokens) as base_url:
+        os.environ["OPENAI_BASE_URL"] = base_url
+        os.environ.setdefault("OPENAI_API_KEY", "mock")
+        asyncio.run(_run(args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
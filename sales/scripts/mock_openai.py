@@ -0,0 +1,159 @@
+"""A local stand-in for the OpenAI chat completions API.
+
+Streams a canned sales email a token at a time, so the app (or
+``scripts/load_test.py``) can generate emails without an API key, network
+access or cost. As with the real API, the response only starts after some
+latency (the time to the first token), then tokens follow at a steady pace.
+A share of requests can be made to fail, as rate limited or with a server
+error, to exercise retries. Point the app at it with:
+
+    OPENAI_BASE_URL=http://127.0.0.1:8001/v1 OPENAI_API_KEY=mock reflex run
+
+Usage (from the ``sales`` directory):
+
+    python scripts/mock_openai.py [--port 8001] [--latency 0.5] [--token-delay 0.02]
+        [--tokens 200] [--error-rate 0]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+import uuid
+from pathlib import Path
+
+from granian import Granian
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+_EMAIL = (
+    "Dear customer, thank you for shopping with Reflex. Based on your interests "
+    "we think you will love our new Hoodie, made of a soft cotton and polyester "
+    "blend and perfect for every season. Visit https://reflex.dev to find out "
+    "more. Best regards, the Reflex team. "
+)
+
+
+def _tokens(count: int) -> list[str]:
+    """``count`` word-sized tokens of the canned email, repeated as needed."""
+    words = _EMAIL.split(" ")
+    return [words[i % len(words)] + " " for i in range(count)]
+
+
+def _chunk(completion_id: str, model: str, delta: dict, finish_reason=None) -> str:
+    chunk = {
+        "id": completion_id,
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+    }
+    return f"data: {json.dumps(chunk)}\n\n"
+
+
+def create_app(
+    latency: float = 0.5,
+    token_delay: float = 0.02,
+    tokens: int = 200,
+    error_rate: float = 0.0,
+) -> Starlette:
+    """The mock API, streaming ``tokens`` tokens ``token_delay`` seconds apart.
+
+    A share ``error_rate`` of requests fails, half with a 429 and half with a 500.
+    """
+
+    async def chat_completions(request: Request):
+        body = await request.json()
+        if random.random() < error_rate:
+            if random.random() < 0.5:
+                return JSONResponse(
+                    {"error": {"message": "Rate limit reached", "type": "requests"}},
+                    status_code=429,
+                    headers={"retry-after": "0.1"},
+                )
+            return JSONResponse(
+                {
+                    "error": {
+                        "message": "The server had an error",
+                        "type": "server_error",
+                    }
+                },
+                status_code=500,
+            )
+        model = body.get("model", "mock")
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        await asyncio.sleep(latency)
+        if not body.get("stream"):
+            await asyncio.sleep(token_delay * tokens)
+            return JSONResponse(
+                {
+                    "id": completion_id,
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [
+                        {
+                            "index": 0,
+                            "message": {
+                                "role": "assistant",
+                                "content": "".join(_tokens(tokens)),
+                            },
+                            "finish_reason": "stop",
+                        }
+                    ],
+                }
+            )
+
+        async def events():
+            yield _chunk(completion_id, model, {"role": "assistant", "content": ""})
+            for token in _tokens(tokens):
+                await asyncio.sleep(token_delay)
+                yield _chunk(completion_id, model, {"content": token})
+            yield _chunk(completion_id, model, {}, "stop")
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return Starlette(
+        routes=[Route("/v1/chat/completions", chat_completions, methods=["POST"])]
+    )
+
+
+# The app served by main(); the server's worker process imports it from here.
+app = create_app(
+    float(os.environ.get("MOCK_OPENAI_LATENCY", 0.5)),
+    float(os.environ.get("MOCK_OPENAI_TOKEN_DELAY", 0.02)),
+    int(os.environ.get("MOCK_OPENAI_TOKENS", 200)),
+    float(os.environ.get("MOCK_OPENAI_ERROR_RATE", 0.0)),
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--token-delay", type=float, default=0.02)
+    parser.add_argument("--tokens", type=int, default=200)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    os.environ["MOCK_OPENAI_LATENCY"] = str(args.latency)
+    os.environ["MOCK_OPENAI_TOKEN_DELAY"] = str(args.token_delay)
+    os.environ["MOCK_OPENAI_TOKENS"] = str(args.tokens)
+    os.environ["MOCK_OPENAI_ERROR_RATE"] = str(args.error_rate)
+    Granian(
+        "mock_openai:app",
+        address=args.host,
+        port=args.port,
+        interface="asgi",
+        working_dir=Path(__file__).resolve().parent,
+        log_access=False,
+    ).serve()
+
+
+if __name__ == "__main__":
+    main()